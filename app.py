@@ -1,7 +1,18 @@
+import asyncio
+import signal
+import time
+from typing import Optional
+
+from tornado.httpserver import HTTPServer
 import tornado.ioloop
+from tornado.netutil import bind_sockets
 from tornado.options import options, parse_command_line
 
+from reporter.sessions import close_session
 from server.configuration.application import MyApplication
+from server.configuration.settings import SHUTDOWN_TIMEOUT, settings
+from server.process import Supervisor
+from server.scheduler import JobRunner, Scheduler
 from server.urls import urls
 
 
@@ -11,17 +22,70 @@ def make_app() -> MyApplication:
     return app
 
 
+async def shutdown(server: HTTPServer, app: MyApplication, scheduler: Optional[Scheduler]) -> None:
+    """
+    Stop the server gracefully.
+
+    The app stops reporting that it's ready and accepting connections, then requests and jobs in progress get
+    SHUTDOWN_TIMEOUT seconds to finish before the event loop is stopped.
+    """
+    if not app.ready:
+        return
+    print(f'Tornado app shutting down on port: {options.port}')
+    app.ready = False
+    server.stop()
+    if scheduler:
+        scheduler.stop()
+
+    deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+    while app.active_requests or (app.job_runner and app.job_runner.tasks):
+        if time.monotonic() > deadline:
+            print('Tornado app stopped before requests and jobs in progress finished')
+            break
+        await asyncio.sleep(0.1)
+
+    await server.close_all_connections()
+    await close_session()
+    tornado.ioloop.IOLoop.current().stop()
+
+
 def main():
-    """Run the app."""
+    """
+    Run the app.
+
+    With `--processes` other than 1 the listening socket is bound first and shared by forked processes, which are
+    stopped together when the parent process gets SIGTERM. Scheduled jobs run in the first process only.
+    """
     parse_command_line()
+    if options.processes != 1 and settings['debug']:
+        raise SystemExit('The debug mode can run in a single process only, set DEBUG=false to fork processes.')
+
+    sockets = bind_sockets(options.port)
+    task_id = 0
+    if options.processes != 1:
+        task_id = Supervisor(options.processes).start()
+
     app = make_app()
-    app.listen(options.port)
+    scheduler = None
+    if options.in_process_jobs:
+        app.job_runner = JobRunner()
+        if task_id == 0:
+            scheduler = Scheduler(app.job_runner)
+            scheduler.start()
+    server = HTTPServer(app)
+    server.add_sockets(sockets)
+
+    io_loop = tornado.ioloop.IOLoop.current()
+    asyncio.get_event_loop().add_signal_handler(
+        signal.SIGTERM,
+        lambda: asyncio.ensure_future(shutdown(server, app, scheduler)),
+    )
     print(f'Tornado app starting on port: {options.port}')
     try:
-        tornado.ioloop.IOLoop.current().start()
+        io_loop.start()
     except KeyboardInterrupt:
         print(f'Tornado app stoping on port: {options.port}')
-        tornado.ioloop.IOLoop.current().stop()
+        io_loop.stop()
 
 
 if __name__ == '__main__':
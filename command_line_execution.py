@@ -4,6 +4,7 @@ import logging
 import time
 
 from reporter.bridge import Bridge
+from reporter.sessions import close_session
 
 logging.basicConfig(
     filename='reporter.log',
@@ -14,7 +15,10 @@ logging.basicConfig(
 
 async def main(sprint_number):
     """Execute the script in a event loop."""
-    await Bridge(sprint_number).run()
+    try:
+        await Bridge(sprint_number).run()
+    finally:
+        await close_session()
 
 
 if __name__ == '__main__':
@@ -29,6 +29,17 @@ for example a Jira app should contain logic that will gather data from a sprint
     :show-inheritance:
 
 
+Blocks
+------
+
+This module contains builders of Slack Block Kit blocks. Templates are loaded once per process and every builder
+returns a fresh block that can be modified freely.
+
+.. automodule:: reporter.blocks
+    :members:
+    :show-inheritance:
+
+
 Bridge
 ------
 
@@ -50,6 +61,26 @@ This module contains custom exceptions that are used by the reporter package.
     :show-inheritance:
 
 
+Limiters
+--------
+
+This module contains helpers that keep the reporter within the rate limits of 3rd party APIs.
+
+.. automodule:: reporter.limiters
+    :members:
+    :show-inheritance:
+
+
+Messages
+--------
+
+This module contains a packer that splits rendered blocks into Slack messages within Slack's limits.
+
+.. automodule:: reporter.messages
+    :members:
+    :show-inheritance:
+
+
 Parsers
 -------
 
@@ -60,4 +91,25 @@ logic that restructures or filters data returned from an adapter.
     :members:
     :show-inheritance:
 
+
+Sessions
+--------
+
+This module contains the HTTP session shared by adapters and the Slack client within a process, so connections
+and resolved hosts are reused between runs.
+
+.. automodule:: reporter.sessions
+    :members:
+    :show-inheritance:
+
+
+Teams
+-----
+
+This module contains the configuration of teams, which maps sprints and boards to the channels their reminders are
+posted to.
+
+.. automodule:: reporter.teams
+    :members:
+
 """
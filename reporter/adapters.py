@@ -1,16 +1,48 @@
 import asyncio
+import hashlib
+import json
 from json.decoder import JSONDecodeError
 import logging
+import time
+from typing import AsyncIterator, Mapping, Optional, Tuple
 from urllib.parse import urljoin
 
-from aiohttp import BasicAuth, ClientSession
-import requests
-from requests.exceptions import ConnectionError, Timeout
+from aiohttp import (
+    BasicAuth,
+    ClientConnectionError,
+    ClientResponse,
+    ClientTimeout,
+)
 
-from .conf import JIRA_AUTH, JIRA_DOMAIN, JIRA_SPRINT
+from .conf import (
+    JIRA_AUTH,
+    JIRA_CACHE_TTL,
+    JIRA_CIRCUIT_FAILURES,
+    JIRA_CIRCUIT_RESET_TIMEOUT,
+    JIRA_DEVELOPMENT_FIELD,
+    JIRA_DOMAIN,
+    JIRA_MAX_CONCURRENCY,
+    JIRA_MAX_RETRIES,
+    JIRA_MAX_TIMEOUT,
+    JIRA_MIN_TIMEOUT,
+    JIRA_PAGE_SIZE,
+    JIRA_RATE_LIMIT,
+    JIRA_RETRY_BACKOFF,
+    JIRA_SPRINT,
+    JIRA_TIMEOUT,
+)
 from .exceptions import ResponseStatusCodeException
+from .limiters import (
+    AdaptiveTimeout,
+    CircuitBreaker,
+    ConcurrencyLimiter,
+    TokenBucket,
+    get_backoff,
+    get_retry_after,
+)
 from .parsers import JiraParser
-from .utils import get_value_from_redis
+from .sessions import get_session
+from .utils import get_value_from_redis, set_key_in_redis
 
 logger = logging.getLogger('reporter')
 
@@ -24,31 +56,152 @@ class BaseAdapter:
 
     auth = None
     domain = None
+    max_retries = 0
+    retry_backoff = 0.5
+    max_retry_backoff = 10.0
+    timeout: Optional[AdaptiveTimeout] = None
+    circuit_breaker: Optional[CircuitBreaker] = None
+    rate_limiter: Optional[TokenBucket] = None
 
     def __init__(self, **kwargs):
         """Initialize."""
-        self.transport = kwargs.pop('transport', None) or requests
+        self.transport = kwargs.pop('transport', None)
         self.domain = kwargs.pop('domain', None) or self.domain
-        self.timeout = 1
 
-    def _get(self, endpoint_path: str, data=None) -> dict:
+    async def _get(self, endpoint_path: str, data=None, cache_ttl: int = None) -> dict:
+        """
+        Send a GET request and return its JSON content.
+
+        When the adapter has a rate limiter every request waits for its turn and a throttled request (HTTP 429) is
+        retried after the time given in its Retry-After header.
+
+        With `cache_ttl` the response is kept in Redis together with its ETag/Last-Modified headers. The next request
+        is sent as a conditional one and a 304 Not Modified response is answered from the cache.
+
+        :param endpoint_path: the endpoint's path
+        :param data: the query data that should be sent
+        :param cache_ttl: for how many seconds the response should be cached
+        """
         url = self._build_url(endpoint_path)
-        try:
-            response = self.transport.get(url, params=data, auth=self.auth)
-        except (ConnectionError, Timeout) as ex:
-            logger.error('%s (%s): An %s occurred', self.__class__.__name__, url, ex.__class__.__name__)
-            raise
+        if not cache_ttl:
+            _, content = await self._send(url, data)
+            return content
+
+        key = self._get_cache_key(url, data)
+        cached = get_value_from_redis(key) or {}
+        headers = {}
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+
+        response_headers, content = await self._send(url, data, headers)
+        if content is None:
+            content = cached['content']
+        else:
+            cached = {
+                'etag': response_headers.get('ETag'),
+                'last_modified': response_headers.get('Last-Modified'),
+                'content': content,
+            }
+        if cached['etag'] or cached['last_modified']:
+            set_key_in_redis(key, cached, expire=cache_ttl)
+        return content
+
+    async def _send(self, url: str, data=None, headers: dict = None) -> Tuple[Mapping, Optional[dict]]:
+        """
+        Send a GET request and return the response's headers and JSON content.
+
+        A request that failed to connect, timed out or got a server error is retried after a jittered exponential
+        backoff, a throttled one after the time given in its Retry-After header, see `_wait`.
+
+        The content is None when a conditional request was answered with 304 Not Modified.
+        """
+        transport = self.transport or await get_session()
+        auth = BasicAuth(*self.auth) if self.auth else None
+        for attempt in range(self.max_retries + 1):
+            options = await self._before_request()
+            started_at = time.monotonic()
+            try:
+                async with transport.get(url, params=data, auth=auth, headers=headers, **options) as response:
+                    retry_after = self._check_response(response, attempt, started_at)
+                    if retry_after is None or attempt == self.max_retries:
+                        return response.headers, await self._read_response(url, response, conditional=bool(headers))
+                    throttled = response.status == 429
+            except (ClientConnectionError, asyncio.TimeoutError) as ex:
+                self._record_failure(ex)
+                if attempt == self.max_retries:
+                    logger.error('%s (%s): An %s occurred', self.__class__.__name__, url, ex.__class__.__name__)
+                    raise
+                retry_after = get_backoff(attempt, self.retry_backoff, self.max_retry_backoff)
+                throttled = False
+
+            logger.warning('%s (%s): request failed, retrying in %.2fs', self.__class__.__name__, url, retry_after)
+            await self._wait(retry_after, throttled)
+
+    async def _before_request(self) -> dict:
+        """Wait until a request may be sent and return its additional options."""
+        if self.circuit_breaker:
+            self.circuit_breaker.check()
+        if self.rate_limiter:
+            await self.rate_limiter.acquire()
+        return {'timeout': ClientTimeout(total=self.timeout.value)} if self.timeout else {}
 
-        if response.status_code != 200:
-            logger.error('%s (%s): response returned status_code=%s', self.__class__.__name__, url, response.status_code)
+    async def _wait(self, seconds: float, throttled: bool = False) -> None:
+        """
+        Wait before retrying a request.
+
+        When the API throttled the request, the rate limiter is paused, so every waiting request backs off. Other
+        failures, e.g. a server error or a timeout, only delay the retry of the failed request.
+        """
+        if throttled and self.rate_limiter:
+            self.rate_limiter.pause(seconds)
+        else:
+            await asyncio.sleep(seconds)
+
+    def _check_response(self, response: ClientResponse, attempt: int, started_at: float) -> Optional[float]:
+        """
+        Record the response's outcome and return after how many seconds the request should be retried.
+
+        None is returned when the request shouldn't be retried.
+        """
+        if response.status == 429:
+            return get_retry_after(response.headers.get('Retry-After'), default=2 ** attempt)
+        if response.status >= 500:
+            self._record_failure()
+            return get_backoff(attempt, self.retry_backoff, self.max_retry_backoff)
+
+        if self.circuit_breaker:
+            self.circuit_breaker.record_success()
+        if self.timeout:
+            self.timeout.record(time.monotonic() - started_at)
+        return None
+
+    def _record_failure(self, ex: Exception = None) -> None:
+        if self.circuit_breaker:
+            self.circuit_breaker.record_failure()
+        if self.timeout and isinstance(ex, asyncio.TimeoutError):
+            self.timeout.record_timeout()
+
+    async def _read_response(self, url: str, response: ClientResponse, conditional: bool = False) -> Optional[dict]:
+        if conditional and response.status == 304:
+            return None
+
+        if response.status != 200:
+            logger.error('%s (%s): response returned status_code=%s', self.__class__.__name__, url, response.status)
             raise ResponseStatusCodeException(f"{self.__class__.__name__}: request didn't return HTTP 200 OK!")
 
         try:
-            return response.json()
+            return await response.json(content_type=None)
         except JSONDecodeError:
             logger.error("%s (%s): response isn't a valid json", self.__class__.__name__, url)
             raise
 
+    @staticmethod
+    def _get_cache_key(url: str, data=None) -> str:
+        params = json.dumps(data, sort_keys=True)
+        return 'http-cache:' + hashlib.sha1(f'{url}?{params}'.encode()).hexdigest()
+
     def _build_url(self, endpoint_url: str) -> str:
         return urljoin(self.domain, endpoint_url)
 
@@ -63,11 +216,30 @@ class JiraAdapter(BaseAdapter):
 
     auth = JIRA_AUTH
     domain = JIRA_DOMAIN
+    page_size = JIRA_PAGE_SIZE
+    max_retries = JIRA_MAX_RETRIES
+    cache_ttl = JIRA_CACHE_TTL
+    # None until the field is looked up in Jira, an empty string when there is none.
+    development_field: Optional[str] = JIRA_DEVELOPMENT_FIELD
+    retry_backoff = JIRA_RETRY_BACKOFF
+    max_retry_backoff = JIRA_MAX_TIMEOUT
+    # Shared by all instances, so every run in the process learns from the previous ones
+    # and runs of many teams together stay within the limits of the Jira account.
+    timeout = AdaptiveTimeout(JIRA_TIMEOUT, JIRA_MIN_TIMEOUT, JIRA_MAX_TIMEOUT)
+    circuit_breaker = CircuitBreaker(JIRA_CIRCUIT_FAILURES, JIRA_CIRCUIT_RESET_TIMEOUT)
+    rate_limiter = TokenBucket(JIRA_RATE_LIMIT)
+    concurrency_limiter = ConcurrencyLimiter(JIRA_MAX_CONCURRENCY)
 
-    def __init__(self, sprint: int = None):
-        """Initialize."""
+    def __init__(self, sprint: int = None, board: int = None):
+        """
+        Initialize.
+
+        :param sprint: a number of the sprint to search
+        :param board: an id of the board whose active sprint should be searched when the sprint isn't given
+        """
         super().__init__()
-        self.sprint = sprint or self._get_sprint_number()
+        self.board = board
+        self.sprint = sprint or (None if board else self._get_sprint_number())
         self._parser = JiraParser()
 
     @staticmethod
@@ -81,9 +253,26 @@ class JiraAdapter(BaseAdapter):
             sprint = JIRA_SPRINT
         return int(sprint)
 
-    def get_sprint_board_issues(self) -> list:
+    async def get_active_sprint(self) -> int:
         """
-        Return the sprint board's issues.
+        Return the number of the board's active sprint.
+
+        Support url:
+            https://developer.atlassian.com/cloud/jira/software/rest/#api-agile-1-0-board-boardId-sprint-get
+
+        :raises ValueError: when the board doesn't have an active sprint
+        """
+        response = await self._get(f'agile/1.0/board/{self.board}/sprint', {'state': 'active'})
+        if not response.get('values'):
+            raise ValueError(f"Board {self.board} doesn't have an active sprint")
+        return response['values'][0]['id']
+
+    async def get_sprint_board_issues(self) -> AsyncIterator[list]:
+        """
+        Yield the sprint board's issues page by page.
+
+        The first page tells us how many issues there are, the remaining pages are then requested concurrently
+        and yielded in order as soon as they arrive. A remaining page that couldn't be fetched is skipped.
 
         Support url:
             https://developer.atlassian.com/cloud/jira/software/rest/#api-agile-1-0-sprint-sprintId-issue-get
@@ -92,10 +281,89 @@ class JiraAdapter(BaseAdapter):
         endpoint_path = f'agile/1.0/sprint/{self.sprint}/issue'
         data = {
             'jql': 'status="In Review"',
-            'fields': ['assignee', 'status', 'summary'],
+            'fields': 'assignee,status,summary,updated',
+            'startAt': 0,
+            'maxResults': self.page_size,
         }
-        response = self._get(endpoint_path, data)
-        return self._parser.filter_out_important_data(response)
+        response = await self._get(endpoint_path, data)
+        yield self._parser.filter_out_important_data(response)
+
+        page_size = response.get('maxResults') or self.page_size
+        total = response.get('total', 0)
+        pages = [
+            asyncio.create_task(self._get(endpoint_path, {**data, 'startAt': start, 'maxResults': page_size}))
+            for start in range(response.get('startAt', 0) + page_size, total, page_size)
+        ]
+        try:
+            for page in pages:
+                try:
+                    response = await page
+                except Exception as ex:
+                    logger.error('%s: a page of the sprint board was skipped: %r', self.__class__.__name__, ex)
+                    continue
+                yield self._parser.filter_out_important_data(response)
+        finally:
+            for page in pages:
+                page.cancel()
+
+    async def get_development_field(self) -> Optional[str]:
+        """
+        Return the id of the field that summarizes the development information of issues, e.g. their pull requests.
+
+        Unless it is set with JIRA_DEVELOPMENT_FIELD, the field is looked up among Jira's fields once per process.
+        When the lookup fails, None is returned and the next call tries again.
+
+        Support url:
+            https://developer.atlassian.com/cloud/jira/platform/rest/v2/api-group-issue-fields/#api-rest-api-2-field-get
+        """
+        if self.development_field is None:
+            try:
+                fields = await self._get('api/2/field')
+            except Exception as ex:
+                logger.warning('%s: the development field was not looked up: %r', self.__class__.__name__, ex)
+                return None
+            self.__class__.development_field = next(
+                (field['id'] for field in fields if self._parser.is_development_field(field)),
+                '',
+            )
+        return self.development_field
+
+    async def filter_issues_with_open_pull_requests(self, issues: list) -> list:
+        """
+        Drop issues whose development summary shows no open pull requests.
+
+        The summaries of all issues are requested in one paginated search, so detailed dev-status requests are only
+        sent for issues that may need them. Issues are returned unchanged when the development field isn't known yet,
+        see `get_development_field`, and issues that weren't checked because the search failed are kept.
+
+        Support url:
+            https://developer.atlassian.com/cloud/jira/platform/rest/v2/api-group-issue-search/#api-rest-api-2-search-get
+
+        :param issues: a list of dicts that contain issues information
+        """
+        if not self.development_field or not issues:
+            return issues
+
+        data = {
+            'jql': f'id in ({",".join(str(issue["id"]) for issue in issues)})',
+            'fields': self.development_field,
+            'maxResults': len(issues),
+        }
+        without_pull_requests = set()
+        start = 0
+        while True:
+            try:
+                response = await self._get('api/2/search', {**data, 'startAt': start})
+            except Exception as ex:
+                logger.warning('%s: issues were not pre-filtered: %r', self.__class__.__name__, ex)
+                break
+            for issue in response['issues']:
+                if not self._parser.has_open_pull_requests(issue['fields'].get(self.development_field)):
+                    without_pull_requests.add(str(issue['id']))
+            start += len(response['issues'])
+            if not response['issues'] or start >= response.get('total', 0):
+                break
+        return [issue for issue in issues if str(issue['id']) not in without_pull_requests]
 
     async def get_pull_requests(self, issues: list) -> list:
         """
@@ -103,35 +371,58 @@ class JiraAdapter(BaseAdapter):
 
         :param issues: a list of dicts that contain issues information
         """
+        return [
+            pull_request
+            for pull_requests in await self.get_pull_requests_per_issue(issues)
+            for pull_request in pull_requests or []
+        ]
+
+    async def get_pull_requests_per_issue(self, issues: list) -> list:
+        """
+        Return information about pull requests for every issue, in the same order as the issues.
+
+        At most JIRA_MAX_CONCURRENCY requests of all adapters are in flight at once, also when pages of issues or
+        boards of teams are looked up concurrently, and they are paced by the shared rate limiter. An issue whose
+        pull requests couldn't be fetched gets None instead, so the other issues are still reported.
+
+        :param issues: a list of dicts that contain issues information
+        """
+        async def get_pull_requests_for_issue(issue: dict, data: dict) -> dict:
+            async with self.concurrency_limiter:
+                return await self._get_pull_requests_for_issue(issue, data)
+
         tasks = []
-        async with ClientSession(auth=BasicAuth(*self.auth)) as session:
-            for issue in issues:
-                data = {
-                    'issueId': issue['id'],
-                    'applicationType': 'bitbucket',
-                    'dataType': 'pullrequest',
-                }
-                tasks.append(
-                    asyncio.create_task(
-                        self._get_pull_requests_for_issue(session, issue, data),
-                    ),
-                )
+        for issue in issues:
+            data = {
+                'issueId': issue['id'],
+                'applicationType': 'bitbucket',
+                'dataType': 'pullrequest',
+            }
+            tasks.append(
+                asyncio.create_task(
+                    get_pull_requests_for_issue(issue, data),
+                ),
+            )
 
-            pull_requests = await asyncio.gather(*tasks)
+        results = await asyncio.gather(*tasks, return_exceptions=True)
 
-        return self._parser.parse_pull_request_info(pull_requests)
+        pull_requests = []
+        for issue, result in zip(issues, results):
+            if isinstance(result, BaseException):
+                logger.error('%s: pull requests of %s were skipped: %r', self.__class__.__name__, issue['key'], result)
+                pull_requests.append(None)
+            else:
+                pull_requests.append(self._parser.parse_pull_request_info([result]))
+        return pull_requests
 
-    async def _get_pull_requests_for_issue(self, session: ClientSession, issue: dict, data: dict) -> dict:
+    async def _get_pull_requests_for_issue(self, issue: dict, data: dict) -> dict:
         """
         Return pull requests assigned to an issue.
 
-        :param session: a ClientSession
         :param issue: the issue's info
         :param data: the query data that should be sent
         :return: a dictionary containing information about the issue and it's pull requests
         """
-        url = self._build_url('dev-status/1.0/issue/detail')
-        async with session.get(url, params=data) as resp:
-            response = await resp.json()
-            response['detail'][0].update(issue)
+        response = await self._get('dev-status/1.0/issue/detail', data, cache_ttl=self.cache_ttl)
+        response['detail'][0].update(issue)
         return response
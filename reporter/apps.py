@@ -1,169 +1,425 @@
 import asyncio
-from copy import deepcopy
 import json
-import os
-from typing import Optional
+import logging
+from time import time
+from typing import AsyncIterator, Iterable, Iterator, Optional
 
-from slack_sdk.web.async_client import AsyncWebClient
+from redis import ResponseError
+from redis.client import Pipeline
+from slack_sdk.errors import SlackApiError
 
+from . import blocks
 from .adapters import JiraAdapter
-from .conf import SLACK_CHANNEL_ID, SLACK_TOKEN
-from .slughify import slughifi
-from .utils import get_value_from_redis, set_key_in_redis
+from .conf import (
+    JIRA_SNAPSHOT_MAX_AGE,
+    JIRA_SNAPSHOT_TTL,
+    SLACK_CHANNEL_ID,
+    SLACK_MAX_RETRIES,
+    SLACK_MEMBERS_PAGE_SIZE,
+    SLACK_TOKEN,
+)
+from .limiters import get_retry_after
+from .messages import ChannelSender, MessagePacker
+from .parsers import SlackParser
+from .sessions import PooledAsyncWebClient
+from .slughify import slughifi, slughifi_many
+from .utils import (
+    get_hash_values_from_redis,
+    get_value_from_redis,
+    key_exists_in_redis,
+    redis_pipeline,
+    set_key_in_redis,
+    single_flight,
+)
 
 __version__ = '1.0.0'
 
+logger = logging.getLogger('reporter')
+
+SLACK_MEMBERS = 'slack-members'
+SLACK_MEMBERS_INDEX = 'slack-members-index'
+SLACK_KNOWN_USER_IDS = 'slack-known-user-ids'
+
 
 class JiraApp:
     """A class responsible for logic related to Jira."""
 
+    snapshot_max_age = JIRA_SNAPSHOT_MAX_AGE
+    snapshot_ttl = JIRA_SNAPSHOT_TTL
+
     def __init__(self, sprint: int = None, **kwargs):
         """
         Initialize.
 
         :param sprint_number: a number of the sprint to search
-        :param kwargs: additional values such as filter name and value for
-            the filter
+        :param kwargs: additional values such as the board whose active sprint should be searched
         """
-        self.adapter = JiraAdapter(sprint)
+        self.adapter = JiraAdapter(sprint, board=kwargs.get('board'))
+
+    async def get_sprint(self) -> int:
+        """Return the number of the searched sprint, looking up the board's active sprint if it isn't known yet."""
+        if self.adapter.sprint is None:
+            self.adapter.sprint = await self.adapter.get_active_sprint()
+        return self.adapter.sprint
 
     async def run(self) -> list:
-        """Run the process for a given sprint board."""
-        issues = self.adapter.get_sprint_board_issues()
-        pull_requests = await self.adapter.get_pull_requests(issues)
+        """
+        Run the process for a given sprint board.
+
+        Pull requests of issues that weren't updated since the previous run are taken from the sprint's snapshot,
+        only the remaining issues are looked up in Jira.
+
+        Creating a pull request, changing its reviewers or approving it doesn't change the issue's `updated` field,
+        so a snapshot entry is trusted only for `snapshot_max_age` seconds. It saves requests of runs in quick
+        succession, e.g. triggered from Slack, while scheduled runs revalidate every issue, which costs a conditional
+        dev-status request that is usually answered with 304 Not Modified. Older entries are only reported when
+        their issue couldn't be looked up. The snapshot is kept for `snapshot_ttl` seconds, 0 turns it off.
+        """
+        snapshot_key = f'sprint-snapshot:{await self.get_sprint()}'
+        snapshot = (get_value_from_redis(snapshot_key) or {}) if self.snapshot_ttl else {}
+        new_snapshot = {}
+        # Looked up before the pages are requested concurrently, so it's looked up once.
+        await self.adapter.get_development_field()
+
+        tasks = []
+        async for issues in self.adapter.get_sprint_board_issues():
+            tasks.append(asyncio.create_task(self._get_pull_requests(issues, snapshot, new_snapshot)))
+
+        pull_requests = []
+        for page in await asyncio.gather(*tasks):
+            pull_requests.extend(page)
+
+        if self.snapshot_ttl:
+            set_key_in_redis(snapshot_key, new_snapshot, expire=self.snapshot_ttl)
+        return pull_requests
+
+    async def _get_pull_requests(self, issues: list, snapshot: dict, new_snapshot: dict) -> list:
+        """
+        Return pull requests of the given issues.
+
+        :param issues: a page of issues from the sprint board
+        :param snapshot: the snapshot stored by the previous run
+        :param new_snapshot: the snapshot of the current run, it is updated with the given issues
+
+        When pull requests of an issue couldn't be fetched, the previous snapshot's ones are reported if there are any.
+        They keep their old `updated` value, so the issue is looked up again in the next run.
+        """
+        stale_issues = [issue for issue in issues if not self._is_fresh(issue, snapshot.get(str(issue['id'])))]
+        candidates = await self.adapter.filter_issues_with_open_pull_requests(stale_issues)
+        fetched = await self.adapter.get_pull_requests_per_issue(candidates)
+        fetched = {str(issue['id']): issue_pull_requests for issue, issue_pull_requests in zip(candidates, fetched)}
+        fetched_at = time()
+        for issue in stale_issues:
+            issue_pull_requests = fetched.get(str(issue['id']), [])
+            if issue_pull_requests is not None:
+                new_snapshot[str(issue['id'])] = {
+                    'updated': issue['updated'],
+                    'fetched_at': fetched_at,
+                    'pull_requests': issue_pull_requests,
+                }
+
+        pull_requests = []
+        for issue in issues:
+            entry = new_snapshot.get(str(issue['id'])) or snapshot.get(str(issue['id']))
+            if entry:
+                new_snapshot[str(issue['id'])] = entry
+                pull_requests.extend(entry['pull_requests'])
         return pull_requests
 
+    def _is_fresh(self, issue: dict, entry: Optional[dict]) -> bool:
+        """
+        Check if the snapshot's entry can be used instead of asking Jira about an issue.
+
+        :param issue: the issue from the sprint board
+        :param entry: the issue's entry from the previous snapshot
+        """
+        return bool(
+            self.snapshot_max_age
+            and entry and issue['updated']
+            and entry['updated'] == issue['updated']
+            and time() - entry['fetched_at'] < self.snapshot_max_age,
+        )
+
 
 class SlackApp:
     """A class responsible for logic related to Slack."""
 
+    members_page_size = SLACK_MEMBERS_PAGE_SIZE
+    members_sync_timeout = 60 * 5
+    max_retries = SLACK_MAX_RETRIES
+
     def __init__(self, **kwargs):
         """Initialize."""
         self.version = f'*version:* {__version__}'
         self.channel_id = kwargs.get('channel_id') or SLACK_CHANNEL_ID
-        self.known_user_ids = get_value_from_redis('slack-known-user-ids') or {}
+        self.known_user_ids = {}
+
+        self.client = PooledAsyncWebClient(token=SLACK_TOKEN)
+        self.sender = ChannelSender(self.client, self.channel_id)
+
+    async def render_reminder(self, issues: list) -> Iterator[dict]:
+        """
+        Render reminder messages about pull requests.
+
+        Mentions are resolved up front and the messages are yielded as soon as they are full, so posting the first
+        messages can overlap with rendering the next ones. When the workspace members index doesn't exist yet,
+        e.g. right after a deploy, it is synced first, so reviewers aren't mentioned by their plain names.
+
+        :param issues: information about issues
+        """
+        if not key_exists_in_redis(SLACK_MEMBERS_INDEX):
+            await self._sync_members_once()
+        self.known_user_ids = get_value_from_redis(SLACK_KNOWN_USER_IDS) or {}
+        self._resolve_mentions(issues)
+        set_key_in_redis(SLACK_KNOWN_USER_IDS, self.known_user_ids)
+
+        packer = MessagePacker(self._create_starting_blocks)
+        return packer.pack(self._create_issues_blocks(issues))
 
-        self.client = AsyncWebClient(token=SLACK_TOKEN)
-        self.blocks = {
-            'header': self._render_template('header.json'),
-            'author': self._render_template('author.json'),
-            'divider': self._render_template('divider.json'),
-            'title': self._render_template('title.json'),
-            'description': self._render_template('description.json'),
-        }
+    def render_no_pull_requests(self) -> dict:
+        """Render the default message sent when there are no pull requests."""
+        return blocks.no_pull_requests(self.version)
 
     @staticmethod
-    def _render_template(filename: str) -> dict:
-        path = os.path.dirname(os.path.abspath(__file__))
-        path = os.path.join(path, 'templates', filename)
-        with open(path) as json_template:
-            template = json.load(json_template)
-        return template
+    def render_stale_notice(rendered_at: float) -> dict:
+        """
+        Render the message posted before a report that may be out of date.
+
+        :param rendered_at: the timestamp of when the report was rendered
+        """
+        minutes = int((time() - rendered_at) // 60)
+        return {'blocks': [blocks.notice(
+            f':hourglass: _This report was rendered {minutes} minutes ago, '
+            f'an updated one follows if anything changed._',
+        )]}
+
+    async def send_messages(self, messages: Iterable[dict]) -> None:
+        """
+        Send messages to the channel in order.
+
+        Every message is queued to the channel's sender right away, so it is posted while the next ones are produced.
 
-    async def remind_about_pull_requests(self, issues: list) -> None:
+        :param messages: messages that contain blocks that will be used as JSON messages to slack
         """
-        Send a reminder about pull requests.
+        self.sender.start()
+        for message in messages:
+            if not self.sender.running:
+                break
+            await self.sender.put(message)
+            await asyncio.sleep(0)
+        await self.sender.close()
+
+    def _create_issues_blocks(self, issues: list) -> Iterator[list]:
+        """
+        Create blocks of every issue that has pull requests to review.
 
         :param issues: information about issues
         """
-        author = deepcopy(self.blocks['author'])
-        author['elements'][1]['text'] = self.version
-        starting_blocks = [
-            self.blocks['header'],
-            author,
-            self.blocks['divider'],
-        ]
-        message = {'blocks': deepcopy(starting_blocks)}
-        tasks = []
         for issue in issues:
             pull_requests = self._create_pull_requests_descriptions(issue['pull_requests'])
             if pull_requests:
-                title = deepcopy(self.blocks['title'])
-                title['text']['text'] = f':bender: *[{issue["key"]}] {issue["title"]}*'
-                message['blocks'].extend([title] + pull_requests + [self.blocks['divider']])
+                title = blocks.title(f':bender: *[{issue["key"]}] {issue["title"]}*')
+                yield [title] + pull_requests + [blocks.divider()]
 
-            if len(message['blocks']) > 45:
-                tasks.append(asyncio.create_task(self.send_message(message)))
-                message = {'blocks': deepcopy(starting_blocks)}
-
-        if not tasks:
-            tasks = [asyncio.create_task(self.send_message(message))]
-
-        set_key_in_redis('slack-known-user-ids', self.known_user_ids)
-        await asyncio.gather(*tasks)
+    def _create_starting_blocks(self) -> list:
+        """Create blocks that every reminder message starts with."""
+        return [blocks.header(), blocks.author(self.version), blocks.divider()]
 
     def _create_pull_requests_descriptions(self, pull_requests: list) -> list:
         """
-        Create description blocks for existing pull requests
+        Create description blocks for existing pull requests.
+
+        Mentions of reviewers have to be resolved before with `_resolve_mentions`.
 
         :param pull_requests: a list of linked pull requests to an issue
         """
         descriptions = []
         for pull_request in pull_requests:
-            description = deepcopy(self.blocks['description'])
-            reviewers = map(
-                lambda name: self._get_user_mention(name),
-                pull_request['reviewers'],
-            )
-            description['text']['text'] = ' '.join(reviewers)
-            description['accessory']['url'] = pull_request['url']
-            descriptions.append(description)
+            reviewers = [self.known_user_ids[name] for name in pull_request['reviewers']]
+            descriptions.append(blocks.description(' '.join(reviewers), pull_request['url']))
         return descriptions
 
-    def _get_user_mention(self, name: str) -> str:
+    def _resolve_mentions(self, issues: list) -> None:
         """
-        Get text for a user mention.
+        Resolve mentions of all reviewers before rendering a reminder.
 
-        Typically it should be '<@USER_ID>' where USER_ID is a slack user's id but if a user wasn't found then
-        it will return his name.
+        Reviewers that aren't known yet are looked up in the workspace members index in one batch. A mention is
+        typically '<@USER_ID>' where USER_ID is a slack user's id but if a user wasn't found then it is his name.
 
-        :param name: a user's name from a pull request
+        :param issues: information about issues
+        """
+        names = dict.fromkeys(
+            name
+            for issue in issues
+            for pull_request in issue['pull_requests']
+            for name in pull_request['reviewers']
+            if name not in self.known_user_ids
+        )
+        for name, user_id in self._get_user_ids(list(names)).items():
+            self.known_user_ids[name] = f'<@{user_id}>' if user_id else name
 
-        :returns: a mention string
+    @staticmethod
+    def _get_user_ids(names: list) -> dict:
         """
-        try:
-            return self.known_user_ids[name]
-        except KeyError:
-            pass
+        Get slack user ids from the workspace members index.
 
-        mention = name
-        users = get_value_from_redis('slack-members') or []
-        user = self._get_user(name, users)
-        if user:
-            mention = f'<@{user["id"]}>'
+        A name is looked up as it is first, names that weren't found are matched with their ascii version. Both
+        versions are fetched in a single round trip.
 
-        self.known_user_ids[name] = mention
+        :param names: the names of reviewers
+        :returns: a dictionary mapping every name to a user id or None if the user wasn't found
+        """
+        slugs = [slug.decode('utf-8') for slug in slughifi_many(names)]
+        values = get_hash_values_from_redis(SLACK_MEMBERS_INDEX, names + slugs)
+        return {name: values[i] or values[i + len(names)] for i, name in enumerate(names)}
+
+    async def get_members(self) -> AsyncIterator[list]:
+        """Yield members of the slack workspace page by page, following the response's cursor."""
+        cursor = None
+        while True:
+            response = await self._list_members(cursor)
+            yield response['members']
+            cursor = response.get('response_metadata', {}).get('next_cursor')
+            if not cursor:
+                break
+
+    async def _list_members(self, cursor: Optional[str]) -> dict:
+        """
+        Return a page of workspace members.
 
-        return mention
+        `users.list` is a Tier 2 method, a page rejected with a `ratelimited` error is requested again after the
+        time given in the Retry-After header.
 
-    def _get_user(self, name: str, users: list, first_time=True) -> Optional[dict]:
+        :param cursor: the cursor of the page, None for the first one
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await self.client.users_list(cursor=cursor, limit=self.members_page_size)
+            except SlackApiError as ex:
+                if ex.response.get('error') != 'ratelimited' or attempt == self.max_retries:
+                    raise
+                retry_after = get_retry_after(ex.response.headers.get('Retry-After'), default=2 ** attempt)
+                logger.warning('%s: users.list rate limited, retrying in %ss', self.__class__.__name__, retry_after)
+                await asyncio.sleep(retry_after)
+
+    async def _sync_members_once(self) -> None:
+        """Sync the workspace members, a sync that is already running, also in another process, is waited for."""
+        async def sync_members() -> dict:
+            return {'synced': await self.sync_members()}
+
+        await single_flight(
+            'slack-members-sync',
+            sync_members,
+            lock_timeout=self.members_sync_timeout,
+            result_ttl=10,
+        )
+
+    async def sync_members(self) -> int:
         """
-        Get user from slack users.
+        Rebuild the directory of workspace members and its index.
 
-        :param name: the name of a reviewer
-        :param users: a list of users assigned to a slack workspace
-        :param first_time: a boolean to control if this is the first call (for recursion break)
+        Every page of members is written to temporary hashes as soon as it arrives and the temporary hashes replace
+        the current ones at the end, so lookups never see a partially synced directory. A failed sync keeps the
+        current directory and drops the temporary hashes. The cache of resolved mentions is dropped with the old
+        directory, so reviewers that weren't found before are looked up again. A directory stored as a JSON list by
+        older versions is replaced as well.
+
+        :returns: the number of synced members
         """
+        members_key, index_key = f'{SLACK_MEMBERS}:sync', f'{SLACK_MEMBERS_INDEX}:sync'
+        with redis_pipeline() as pipe:
+            pipe.delete(members_key, index_key)
+
+        synced, indexed = 0, 0
         try:
-            user = next(filter(lambda x: x['profile'].get('real_name_normalized') == name, users))
-        except StopIteration:
-            name = slughifi(name).decode('utf-8')
-            if first_time:
-                return self._get_user(name, users, first_time=False)
-            return None
-        return user
+            async for members in self.get_members():
+                members = [SlackParser.compact_member(member) for member in members]
+                with redis_pipeline(transaction=False) as pipe:
+                    indexed += self.index_members(pipe, members, members_key, index_key)
+                synced += len(members)
+        except Exception:
+            with redis_pipeline() as pipe:
+                pipe.delete(members_key, index_key)
+            raise
+
+        with redis_pipeline() as pipe:
+            pipe.delete(SLACK_MEMBERS, SLACK_MEMBERS_INDEX, SLACK_KNOWN_USER_IDS)
+            if synced:
+                pipe.rename(members_key, SLACK_MEMBERS)
+            if indexed:
+                pipe.rename(index_key, SLACK_MEMBERS_INDEX)
+        return synced
+
+    @classmethod
+    def update_member(cls, member: dict) -> None:
+        """
+        Patch the directory of workspace members and its index with a single member, e.g. from a user event.
 
-    async def send_no_pull_requests_message(self) -> None:
-        """Send a default message when no pull requests."""
-        message = self._render_template('no_pull_requests.json')
-        message['blocks'][1]['elements'][1]['text'] = self.version
-        await self.send_message(message)
+        Index entries of the member's previous name are removed. The cache of resolved mentions is dropped only
+        when the member's name or deleted flag changed, `user_change` is also sent for every status change.
 
-    async def send_message(self, message: dict) -> None:
+        :param member: a member of the slack workspace as sent by the Events API
         """
-        Send a message to slack.
+        member = SlackParser.compact_member(member)
+        try:
+            previous = cls._get_member(member['id'])
+        except ResponseError as ex:
+            if 'WRONGTYPE' not in str(ex):
+                raise
+            logger.warning('%s: the members directory of an older version is replaced by the next sync', cls.__name__)
+            return
+        name = previous['real_name_normalized'] if previous else None
+        stale_names = [name, slughifi(name).decode('utf-8')] if name else []
+        stale_ids = get_hash_values_from_redis(SLACK_MEMBERS_INDEX, stale_names)
+
+        with redis_pipeline() as pipe:
+            for stale_name, user_id in zip(stale_names, stale_ids):
+                if user_id == member['id']:
+                    pipe.hdel(SLACK_MEMBERS_INDEX, stale_name)
+            cls.index_members(pipe, [member])
+            if not previous or any(previous[field] != member[field] for field in ('real_name_normalized', 'deleted')):
+                pipe.delete(SLACK_KNOWN_USER_IDS)
+
+    @staticmethod
+    def _get_member(member_id: str) -> Optional[dict]:
+        """
+        Return a compact member from the directory.
+
+        :param member_id: the member's id
+        """
+        value, = get_hash_values_from_redis(SLACK_MEMBERS, [member_id])
+        return json.loads(value) if value else None
+
+    @staticmethod
+    def index_members(
+        pipe: Pipeline,
+        members: list,
+        members_key: str = SLACK_MEMBERS,
+        index_key: str = SLACK_MEMBERS_INDEX,
+    ) -> int:
+        """
+        Queue writes of members to the directory and of their names to the index used to find mentions.
+
+        The directory maps a member's id to the member's compact JSON. The index maps a member's real name and its
+        ascii version to the member's id, so a reviewer is found with a single lookup instead of scanning all
+        members. A real name takes precedence over an ascii version of another name. Deleted members aren't indexed.
 
-        :param message: a dictionary that contains blocks that will be used as
-            JSON message to slack.
+        :param pipe: a Redis pipeline
+        :param members: compact members of the slack workspace
+        :param members_key: the key of the directory
+        :param index_key: the key of the index
+        :returns: the number of indexed members
         """
-        await self.client.chat_postMessage(channel=self.channel_id, **message)
+        if not members:
+            return 0
+        pipe.hset(members_key, mapping={member['id']: json.dumps(member) for member in members})
+
+        real_names = {}
+        for member in members:
+            name = member['real_name_normalized']
+            if name and not member['deleted']:
+                pipe.hsetnx(index_key, slughifi(name).decode('utf-8'), member['id'])
+                real_names[name] = member['id']
+        if real_names:
+            pipe.hset(index_key, mapping=real_names)
+        return len(real_names)
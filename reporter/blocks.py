@@ -0,0 +1,114 @@
+from functools import lru_cache
+import json
+import os
+from typing import Any, Callable
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+
+@lru_cache(maxsize=None)
+def load_template(filename: str) -> Any:
+    """
+    Load a JSON template from the templates directory.
+
+    A template is read from disk once per process, the returned value is shared so it must not be modified.
+
+    :param filename: the template's file name
+    """
+    with open(os.path.join(TEMPLATES_DIR, filename)) as json_template:
+        return json.load(json_template)
+
+
+def compile_template(template: Any) -> Callable[[], Any]:
+    """
+    Turn a JSON template into a function that builds a fresh copy of it.
+
+    The template's structure is walked once, so building a copy only creates new dicts and lists without the
+    bookkeeping done by `copy.deepcopy`.
+
+    :param template: a parsed JSON template
+    """
+    if isinstance(template, dict):
+        items = [(key, compile_template(value)) for key, value in template.items()]
+        return lambda: {key: build() for key, build in items}
+    if isinstance(template, list):
+        elements = [compile_template(value) for value in template]
+        return lambda: [build() for build in elements]
+    return lambda: template
+
+
+@lru_cache(maxsize=None)
+def get_builder(filename: str) -> Callable[[], Any]:
+    """
+    Return a function that builds fresh copies of a template.
+
+    :param filename: the template's file name
+    """
+    return compile_template(load_template(filename))
+
+
+def header() -> dict:
+    """Return the reminder's header block."""
+    return get_builder('header.json')()
+
+
+def author(version: str) -> dict:
+    """
+    Return the block with the reminder's author.
+
+    :param version: the text describing the reporter's version
+    """
+    block = get_builder('author.json')()
+    block['elements'][1]['text'] = version
+    return block
+
+
+def divider() -> dict:
+    """Return a divider block."""
+    return get_builder('divider.json')()
+
+
+def title(text: str) -> dict:
+    """
+    Return an issue's title block.
+
+    :param text: the title's text
+    """
+    block = get_builder('title.json')()
+    block['text']['text'] = text
+    return block
+
+
+def description(text: str, url: str) -> dict:
+    """
+    Return a pull request's description block with a review button.
+
+    :param text: the description's text
+    :param url: the pull request's url
+    """
+    block = get_builder('description.json')()
+    block['text']['text'] = text
+    block['accessory']['url'] = url
+    return block
+
+
+def notice(text: str) -> dict:
+    """
+    Return a block with a notice about the message below it.
+
+    :param text: the notice's text
+    """
+    block = get_builder('notice.json')()
+    block['elements'][0]['text'] = text
+    return block
+
+
+def no_pull_requests(version: str) -> dict:
+    """
+    Return the message sent when there are no pull requests.
+
+    :param version: the text describing the reporter's version
+    """
+    message = get_builder('no_pull_requests.json')()
+    message['blocks'][1]['elements'][1]['text'] = version
+    return message
@@ -1,22 +1,134 @@
+import asyncio
+import logging
+from time import time
+from typing import Iterator
+
 from .apps import JiraApp, SlackApp
+from .conf import (
+    SLACK_REPORT_CACHE_TTL,
+    SLACK_REPORT_FRESH_FOR,
+    SLACK_REPORT_LOCK_TIMEOUT,
+    SLACK_REPORT_MAX_AGE,
+)
+from .utils import get_value_from_redis, set_key_in_redis, single_flight
+
+logger = logging.getLogger('reporter')
 
 
 class Bridge:
     """Class for representing a bridge between Jira and Slack."""
 
+    report_cache_ttl = SLACK_REPORT_CACHE_TTL
+    report_lock_timeout = SLACK_REPORT_LOCK_TIMEOUT
+    report_fresh_for = SLACK_REPORT_FRESH_FOR
+    report_max_age = SLACK_REPORT_MAX_AGE
+
     def __init__(self, sprint_number: int = None, **kwargs):
         """
         Initialize.
 
         :param sprint_number: a number of the sprint to search
+        :param kwargs: additional values such as the channel to post to and the board whose active sprint should be
+            searched when the sprint number isn't given
         """
         self.jira = JiraApp(sprint_number, **kwargs)
         self.slack = SlackApp(channel_id=kwargs.get('channel_id'))
 
+    @classmethod
+    async def run_teams(cls, teams: list) -> None:
+        """
+        Post reminders of many teams concurrently.
+
+        A team that fails doesn't stop the others, its error is logged instead.
+
+        :param teams: a list of teams as described in `reporter.teams.get_teams`
+        """
+        bridges = [cls(team.get('sprint'), channel_id=team['channel_id'], board=team.get('board')) for team in teams]
+        results = await asyncio.gather(*[bridge.run() for bridge in bridges], return_exceptions=True)
+        for team, result in zip(teams, results):
+            if isinstance(result, Exception):
+                logger.error(f'Reminder for team {team} failed', exc_info=result)
+
+    async def get_report_key(self) -> str:
+        """Return the key of the sprint's report in Redis."""
+        return f'sprint-report:{await self.jira.get_sprint()}'
+
     async def run(self) -> None:
-        """Gather data from Jira and post it to slack."""
+        """
+        Gather data from Jira and post it to slack.
+
+        Concurrent runs for the same sprint share one report, which is rendered once and sent to each run's channel.
+        """
+        await self.refresh(send=True)
+
+    async def serve(self) -> None:
+        """
+        Post the sprint's pre-rendered report to slack and refresh it when needed.
+
+        A fresh report is posted right away. A stale one is posted right away as well, after a notice of its age,
+        then it is rendered again and the new report is posted when it changed. Without a report, or with one older
+        than `report_max_age`, the report is rendered before it is posted.
+        """
+        report = get_value_from_redis(await self.get_report_key())
+        if report is None or time() - report['rendered_at'] > self.report_max_age:
+            await self.run()
+            return
+        if time() - report['rendered_at'] <= self.report_fresh_for:
+            await self.slack.send_messages(report['messages'])
+            return
+
+        await self.slack.send_messages([self.slack.render_stale_notice(report['rendered_at'])] + report['messages'])
+        messages = await self.refresh()
+        if messages != report['messages']:
+            await self.slack.send_messages(messages)
+
+    async def refresh(self, send: bool = False) -> list:
+        """
+        Render the sprint's report, sharing the rendering with concurrent refreshes of the same sprint.
+
+        :param send: whether the report should be posted to slack too, the refresh that renders it posts every
+            message as soon as it is rendered
+        """
+        rendered = False
+
+        async def render() -> list:
+            nonlocal rendered
+            rendered = True
+            return await self.render(send)
+
+        messages = await single_flight(
+            await self.get_report_key(),
+            render,
+            lock_timeout=self.report_lock_timeout,
+            result_ttl=self.report_cache_ttl,
+        )
+        if send and not rendered:
+            await self.slack.send_messages(messages)
+        return messages
+
+    async def render(self, send: bool = False) -> list:
+        """
+        Gather data from Jira, render messages about its pull requests and store them as the sprint's report.
+
+        :param send: whether the messages should be posted to slack while the next ones are rendered
+        """
         pull_requests = await self.jira.run()
         if pull_requests:
-            await self.slack.remind_about_pull_requests(pull_requests)
+            rendered = await self.slack.render_reminder(pull_requests)
         else:
-            await self.slack.send_no_pull_requests_message()
+            rendered = iter([self.slack.render_no_pull_requests()])
+
+        messages = []
+        if send:
+            await self.slack.send_messages(self._collect(rendered, messages))
+        messages.extend(rendered)
+        report = {'rendered_at': time(), 'messages': messages}
+        set_key_in_redis(await self.get_report_key(), report, expire=self.report_max_age)
+        return messages
+
+    @staticmethod
+    def _collect(messages: Iterator[dict], collected: list) -> Iterator[dict]:
+        """Yield messages and keep them in a list."""
+        for message in messages:
+            collected.append(message)
+            yield message
@@ -3,9 +3,45 @@ import os
 # Slack credentials
 SLACK_CHANNEL_ID = os.environ.get('SLACK_CHANNEL_ID', '')
 SLACK_TOKEN = os.environ['SLACK_TOKEN']
+SLACK_MAX_BLOCKS = int(os.environ.get('SLACK_MAX_BLOCKS', 50))
+SLACK_MAX_MESSAGE_SIZE = int(os.environ.get('SLACK_MAX_MESSAGE_SIZE', 40000))
+SLACK_RATE_LIMIT = float(os.environ.get('SLACK_RATE_LIMIT', 1))
+SLACK_RATE_BURST = int(os.environ.get('SLACK_RATE_BURST', 3))
+SLACK_MAX_RETRIES = int(os.environ.get('SLACK_MAX_RETRIES', 3))
+SLACK_MEMBERS_PAGE_SIZE = int(os.environ.get('SLACK_MEMBERS_PAGE_SIZE', 200))
+SLACK_REPORT_CACHE_TTL = int(os.environ.get('SLACK_REPORT_CACHE_TTL', 60))
+SLACK_REPORT_LOCK_TIMEOUT = int(os.environ.get('SLACK_REPORT_LOCK_TIMEOUT', 60 * 5))
+SLACK_REPORT_FRESH_FOR = int(os.environ.get('SLACK_REPORT_FRESH_FOR', 60 * 10))
+SLACK_REPORT_MAX_AGE = int(os.environ.get('SLACK_REPORT_MAX_AGE', 60 * 60))
 
 
 # JIRA credentials
 JIRA_AUTH = (os.environ['JIRA_EMAIL'], os.environ['JIRA_TOKEN'])
 JIRA_DOMAIN = os.environ['JIRA_DOMAIN']
 JIRA_SPRINT = os.environ.get('JIRA_SPRINT_NUMBER', '')
+JIRA_PAGE_SIZE = int(os.environ.get('JIRA_PAGE_SIZE', 50))
+JIRA_MAX_CONCURRENCY = int(os.environ.get('JIRA_MAX_CONCURRENCY', 10))
+JIRA_RATE_LIMIT = float(os.environ.get('JIRA_RATE_LIMIT', 10))
+JIRA_MAX_RETRIES = int(os.environ.get('JIRA_MAX_RETRIES', 3))
+JIRA_CACHE_TTL = int(os.environ.get('JIRA_CACHE_TTL', 60 * 60 * 24))
+# Shorter than the interval of scheduled reports, so each of them revalidates pull requests with Jira.
+JIRA_SNAPSHOT_MAX_AGE = int(os.environ.get('JIRA_SNAPSHOT_MAX_AGE', 60 * 15))
+JIRA_SNAPSHOT_TTL = int(os.environ.get('JIRA_SNAPSHOT_TTL', 60 * 60 * 24))
+# Looked up in Jira when it isn't set, an empty value turns the pre-filter off.
+JIRA_DEVELOPMENT_FIELD = os.environ.get('JIRA_DEVELOPMENT_FIELD')
+JIRA_TIMEOUT = float(os.environ.get('JIRA_TIMEOUT', 10))
+JIRA_MIN_TIMEOUT = float(os.environ.get('JIRA_MIN_TIMEOUT', 2))
+JIRA_MAX_TIMEOUT = float(os.environ.get('JIRA_MAX_TIMEOUT', 30))
+JIRA_RETRY_BACKOFF = float(os.environ.get('JIRA_RETRY_BACKOFF', 0.5))
+JIRA_CIRCUIT_FAILURES = int(os.environ.get('JIRA_CIRCUIT_FAILURES', 5))
+JIRA_CIRCUIT_RESET_TIMEOUT = float(os.environ.get('JIRA_CIRCUIT_RESET_TIMEOUT', 30))
+
+
+# Teams
+TEAMS_CONFIG_PATH = os.environ.get('TEAMS_CONFIG_PATH', '')
+
+
+# HTTP connection pool
+HTTP_LIMIT_PER_HOST = int(os.environ.get('HTTP_LIMIT_PER_HOST', 20))
+HTTP_KEEPALIVE_TIMEOUT = float(os.environ.get('HTTP_KEEPALIVE_TIMEOUT', 60))
+HTTP_DNS_CACHE_TTL = int(os.environ.get('HTTP_DNS_CACHE_TTL', 300))
@@ -1,3 +1,13 @@
+class CircuitOpenException(Exception):
+    """
+    An exception for requests to an API that keeps failing.
+
+    It should be raised instead of sending a request while the API's circuit breaker is open.
+    """
+
+    pass
+
+
 class ResponseStatusCodeException(Exception):
     """
     An exception for wrong response status codes.
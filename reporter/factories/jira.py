@@ -45,6 +45,7 @@ class JiraIssueFactory(DictFactory):
         'assignee': SubFactory(AssigneeFactory),
         'status': SubFactory(StatusFactory),
         'summary': Faker('sentence'),
+        'updated': Faker('iso8601'),
     })
 
 
@@ -0,0 +1,208 @@
+import asyncio
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import random
+import time
+from typing import Optional
+from weakref import WeakKeyDictionary
+
+from .exceptions import CircuitOpenException
+
+
+class TokenBucket:
+    """
+    A token bucket rate limiter for coroutines.
+
+    The bucket holds up to `capacity` tokens and is refilled with `rate` tokens per second. Every request takes one
+    token, when the bucket is empty the request waits until a token becomes available.
+    """
+
+    def __init__(self, rate: float, capacity: int = None):
+        """
+        Initialize.
+
+        :param rate: the number of tokens added to the bucket per second
+        :param capacity: the maximum number of tokens (the allowed burst), defaults to the rate
+        """
+        self.rate = rate
+        self.capacity = capacity or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        while True:
+            now = time.monotonic()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stop handing out tokens for a given time.
+
+        It should be used when the API tells us to slow down, so every waiting request backs off, not only
+        the one that got throttled.
+
+        :param seconds: for how long the bucket should stay empty
+        """
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+
+
+class ConcurrencyLimiter:
+    """
+    A limit of coroutines running at once, usable as an async context manager.
+
+    It can be created before an event loop is running and shared by loops, every loop gets its own semaphore.
+    """
+
+    def __init__(self, limit: int):
+        """
+        Initialize.
+
+        :param limit: the number of coroutines that may run at once in a loop
+        """
+        self.limit = limit
+        self._semaphores: WeakKeyDictionary = WeakKeyDictionary()
+
+    async def __aenter__(self) -> None:
+        await self._get_semaphore().acquire()
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._get_semaphore().release()
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.limit)
+        return self._semaphores[loop]
+
+
+class AdaptiveTimeout:
+    """
+    A request timeout that follows the observed latency of an API.
+
+    The timeout is the smoothed latency plus four times its smoothed deviation, the same way TCP computes its
+    retransmission timeout, kept between `minimum` and `maximum`. A request that timed out doubles the timeout.
+    """
+
+    def __init__(self, initial: float, minimum: float, maximum: float):
+        """
+        Initialize.
+
+        :param initial: the timeout used until a latency is recorded
+        :param minimum: the lowest allowed timeout
+        :param maximum: the highest allowed timeout
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.value = initial
+        self._latency: Optional[float] = None
+        self._deviation = 0.0
+
+    def record(self, latency: float) -> None:
+        """
+        Update the timeout with the latency of a successful request.
+
+        :param latency: the request's latency in seconds
+        """
+        if self._latency is None:
+            self._latency, self._deviation = latency, latency / 2
+        else:
+            self._deviation = 0.75 * self._deviation + 0.25 * abs(self._latency - latency)
+            self._latency = 0.875 * self._latency + 0.125 * latency
+        self.value = self._clamp(self._latency + 4 * self._deviation)
+
+    def record_timeout(self) -> None:
+        """Back off after a request timed out."""
+        self.value = self._clamp(self.value * 2)
+
+    def _clamp(self, value: float) -> float:
+        return min(self.maximum, max(self.minimum, value))
+
+
+class CircuitBreaker:
+    """
+    A circuit breaker that fails fast when an API keeps failing.
+
+    After `failure_threshold` failures in a row the circuit opens and every request fails immediately for
+    `reset_timeout` seconds. Then requests are let through again, the first success closes the circuit and another
+    failure opens it for the next `reset_timeout` seconds.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        """
+        Initialize.
+
+        :param failure_threshold: the number of failures in a row that opens the circuit
+        :param reset_timeout: for how many seconds the circuit stays open
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+
+    @property
+    def is_open(self) -> bool:
+        """Return whether requests should fail fast."""
+        return self._opened_at is not None and time.monotonic() - self._opened_at < self.reset_timeout
+
+    def check(self) -> None:
+        """
+        Make sure a request may be sent.
+
+        :raises CircuitOpenException: when the circuit is open
+        """
+        if self.is_open:
+            raise CircuitOpenException(f'The circuit is open after {self.failures} failures')
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful request."""
+        self.failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        """Count a failed request and open the circuit when there were too many of them."""
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+
+
+def get_backoff(attempt: int, base: float, maximum: float) -> float:
+    """
+    Return a random delay before retrying a failed request, a.k.a. exponential backoff with full jitter.
+
+    :param attempt: the number of the failed attempt, starting from 0
+    :param base: the upper bound of the delay after the first attempt
+    :param maximum: the upper bound of every delay
+    """
+    return random.uniform(0, min(maximum, base * 2 ** attempt))
+
+
+def get_retry_after(value: Optional[str], default: float) -> float:
+    """
+    Return the number of seconds to wait from a Retry-After header.
+
+    :param value: the header's value, either a number of seconds or an HTTP date
+    :param default: the value returned when the header is missing or malformed
+    """
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
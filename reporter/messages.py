@@ -0,0 +1,204 @@
+import asyncio
+import json
+import logging
+from time import monotonic
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web.async_client import AsyncWebClient
+
+from .conf import (
+    SLACK_MAX_BLOCKS,
+    SLACK_MAX_MESSAGE_SIZE,
+    SLACK_MAX_RETRIES,
+    SLACK_RATE_BURST,
+    SLACK_RATE_LIMIT,
+)
+from .limiters import TokenBucket, get_retry_after
+
+logger = logging.getLogger('reporter')
+
+_channel_rate_limiters: Dict[str, TokenBucket] = {}
+
+
+class MessagePacker:
+    """
+    A class responsible for packing blocks into Slack messages.
+
+    Every message starts with the same blocks and never exceeds Slack's limit of blocks nor the allowed payload size.
+    Blocks of an issue are kept together in one message, they are split only when they don't fit into an empty one.
+    """
+
+    def __init__(
+        self,
+        starting_blocks: Callable[[], list],
+        max_blocks: int = SLACK_MAX_BLOCKS,
+        max_size: int = SLACK_MAX_MESSAGE_SIZE,
+    ):
+        """
+        Initialize.
+
+        :param starting_blocks: a function that creates blocks every message starts with
+        :param max_blocks: the maximum number of blocks in a message
+        :param max_size: the maximum size of a message's serialized blocks
+        """
+        self.starting_blocks = starting_blocks
+        self.max_blocks = max_blocks
+        self.max_size = max_size
+
+    def pack(self, issues_blocks: Iterable[list]) -> Iterator[dict]:
+        """
+        Yield messages as soon as they are full.
+
+        The last message is yielded even when it contains only the starting blocks and no message was yielded
+        before, so a reminder is always sent.
+
+        :param issues_blocks: blocks of every issue, the first one is the issue's title and the last one closes it
+        """
+        message = self._new_message()
+        sent = False
+        for issue_blocks in issues_blocks:
+            for part in self._split(issue_blocks):
+                if not self._fits(message, part) and len(message['blocks']) > message['starting']:
+                    yield self._finish(message)
+                    sent = True
+                    message = self._new_message()
+                self._append(message, part)
+
+        if not sent or len(message['blocks']) > message['starting']:
+            yield self._finish(message)
+
+    def _new_message(self) -> dict:
+        blocks = self.starting_blocks()
+        return {'blocks': blocks, 'starting': len(blocks), 'size': sum(map(self._size, blocks))}
+
+    @staticmethod
+    def _finish(message: dict) -> dict:
+        return {'blocks': message['blocks']}
+
+    def _fits(self, message: dict, blocks: list) -> bool:
+        return (
+            len(message['blocks']) + len(blocks) <= self.max_blocks
+            and message['size'] + sum(map(self._size, blocks)) <= self.max_size
+        )
+
+    def _append(self, message: dict, blocks: list) -> None:
+        message['blocks'].extend(blocks)
+        message['size'] += sum(map(self._size, blocks))
+
+    def _split(self, issue_blocks: list) -> List[list]:
+        """
+        Split blocks of an issue into parts that fit into an empty message.
+
+        Every part repeats the issue's title and ends with the issue's closing block.
+
+        :param issue_blocks: blocks of an issue
+        """
+        if len(issue_blocks) < 3 or self._fits(self._new_message(), issue_blocks):
+            return [issue_blocks]
+
+        title, body, closing = issue_blocks[0], issue_blocks[1:-1], issue_blocks[-1]
+        parts = []
+        part = [title]
+        for block in body:
+            if len(part) > 1 and not self._fits(self._new_message(), part + [block, closing]):
+                parts.append(part + [closing])
+                part = [title]
+            part.append(block)
+        parts.append(part + [closing])
+        return parts
+
+    @staticmethod
+    def _size(block: dict) -> int:
+        return len(json.dumps(block))
+
+
+def get_channel_rate_limiter(channel_id: str) -> TokenBucket:
+    """
+    Return the rate limiter of a slack channel.
+
+    The limiter is shared by all senders in a process, so concurrent reminders to one channel are paced together.
+
+    :param channel_id: the channel's id
+    """
+    if channel_id not in _channel_rate_limiters:
+        _channel_rate_limiters[channel_id] = TokenBucket(SLACK_RATE_LIMIT, SLACK_RATE_BURST)
+    return _channel_rate_limiters[channel_id]
+
+
+class ChannelSender:
+    """
+    A class responsible for sending messages to a slack channel.
+
+    Messages are sent one by one in the order they were queued and paced to the channel's rate limit. A message
+    rejected with a `ratelimited` error is sent again after the time given in the Retry-After header.
+    """
+
+    max_retries = SLACK_MAX_RETRIES
+
+    def __init__(self, client: AsyncWebClient, channel_id: str):
+        """
+        Initialize.
+
+        :param client: a slack client
+        :param channel_id: the id of the channel to send messages to
+        """
+        self.client = client
+        self.channel_id = channel_id
+        self.rate_limiter = get_channel_rate_limiter(channel_id)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """Check if the sender accepts queued messages."""
+        return self._worker is not None and not self._worker.done()
+
+    def start(self) -> None:
+        """Start sending queued messages in the background."""
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def put(self, message: dict) -> None:
+        """
+        Queue a message to send.
+
+        :param message: a dictionary that contains blocks that will be used as JSON message to slack.
+        """
+        await self._queue.put((message, monotonic()))
+
+    async def close(self) -> None:
+        """Wait until all queued messages are sent and stop the sender."""
+        await self._queue.put(None)
+        await self._worker
+
+    async def _run(self) -> None:
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            await self.send(*item)
+
+    async def send(self, message: dict, queued_at: float = None) -> None:
+        """
+        Send a message to the channel.
+
+        :param message: a dictionary that contains blocks that will be used as JSON message to slack.
+        :param queued_at: when the message was queued, used to report the message's latency
+        """
+        queued_at = queued_at or monotonic()
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire()
+            try:
+                await self.client.chat_postMessage(channel=self.channel_id, **message)
+            except SlackApiError as ex:
+                if ex.response.get('error') != 'ratelimited' or attempt == self.max_retries:
+                    raise
+                retry_after = get_retry_after(ex.response.headers.get('Retry-After'), default=2 ** attempt)
+                logger.warning('%s (%s): rate limited, retrying in %ss', self.__class__.__name__, self.channel_id,
+                               retry_after)
+                self.rate_limiter.pause(retry_after)
+            else:
+                logger.info('%s (%s): message sent in %.3fs', self.__class__.__name__, self.channel_id,
+                            monotonic() - queued_at)
+                return
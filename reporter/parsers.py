@@ -1,3 +1,7 @@
+import re
+from typing import Optional
+
+
 class JiraParser:
     """A class responsible for parsing a JIRA API response."""
 
@@ -6,7 +10,7 @@ class JiraParser:
         """
         Flatter the dictionary to only important information.
 
-        :param issues_list: issues from the API
+        :param issues_list: a page of issues from the API
         """
         issues = [
             {
@@ -14,11 +18,38 @@ class JiraParser:
                 'key': issue['key'],
                 'title': issue['fields']['summary'],
                 'status': issue['fields']['status']['name'],
+                'updated': issue['fields'].get('updated'),
                 'self': issue['self'],
             } for issue in issues_list['issues']
         ]
         return issues
 
+    @staticmethod
+    def is_development_field(field: dict) -> bool:
+        """
+        Return whether a field is the development field added to issues by Jira's development integration.
+
+        :param field: a field from the list of Jira's fields
+        """
+        custom_type = (field.get('schema') or {}).get('custom', '')
+        return custom_type.split(':')[-1] in ('devsummary', 'devsummarycf')
+
+    @staticmethod
+    def has_open_pull_requests(development: Optional[str]) -> bool:
+        """
+        Return whether the summary of an issue's development field shows open pull requests.
+
+        The field looks like '{pullrequest={dataType=pullrequest, state=OPEN, stateCount=1}, json=...}'. A summary
+        without pull requests or with pull requests in another state returns False, a summary that can't be parsed
+        returns True, so the issue is still checked in detail.
+
+        :param development: the value of the development field
+        """
+        if not development or 'pullrequest' not in development:
+            return False
+        match = re.search(r'pullrequest=\{[^}]*\bstate=(\w+)', development)
+        return match is None or match.group(1) == 'OPEN'
+
     def parse_pull_request_info(self, tickets_info_response: list) -> list:
         """
         Return only necessary info about pull request.
@@ -66,3 +97,22 @@ class JiraParser:
                     }
                     opened_pull_requests.append(info)
         return opened_pull_requests
+
+
+class SlackParser:
+    """A class responsible for parsing a Slack API response."""
+
+    @staticmethod
+    def compact_member(member: dict) -> dict:
+        """
+        Return only the fields of a workspace member that are used.
+
+        :param member: a member from the users.list API or a user event
+        """
+        profile = member.get('profile', {})
+        return {
+            'id': member['id'],
+            'real_name_normalized': profile.get('real_name_normalized'),
+            'display_name': profile.get('display_name_normalized') or profile.get('display_name'),
+            'deleted': bool(member.get('deleted')),
+        }
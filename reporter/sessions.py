@@ -0,0 +1,59 @@
+import asyncio
+import logging
+from typing import Optional
+
+from aiohttp import AsyncResolver, ClientSession, TCPConnector
+from slack_sdk.web.async_client import AsyncWebClient
+
+from .conf import (
+    HTTP_DNS_CACHE_TTL,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_LIMIT_PER_HOST,
+)
+
+logger = logging.getLogger('reporter')
+
+_session: Optional[ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def get_session() -> ClientSession:
+    """
+    Return the process-wide HTTP session.
+
+    The session keeps its connections alive between runs and caches resolved hosts, so only the first request to
+    a host pays for the DNS lookup and the TCP/TLS handshakes. A new session is created when the previous one was
+    closed or belongs to another event loop.
+    """
+    global _session, _session_loop
+
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        connector = TCPConnector(
+            limit_per_host=HTTP_LIMIT_PER_HOST,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+            resolver=AsyncResolver(),
+        )
+        _session = ClientSession(connector=connector)
+        _session_loop = loop
+        logger.debug('Created a new HTTP session')
+    return _session
+
+
+async def close_session() -> None:
+    """Close the process-wide HTTP session and its pooled connections."""
+    global _session, _session_loop
+
+    if _session is not None and not _session.closed and _session_loop is asyncio.get_running_loop():
+        await _session.close()
+    _session, _session_loop = None, None
+
+
+class PooledAsyncWebClient(AsyncWebClient):
+    """A Slack client that sends its requests over the process-wide HTTP session."""
+
+    async def api_call(self, *args, **kwargs):
+        """Attach the shared session and execute the API call to Slack."""
+        self.session = await get_session()
+        return await super().api_call(*args, **kwargs)
@@ -1,4 +1,4 @@
-import re
+from functools import lru_cache
 
 # default unicode character mapping ( you may not see some chars, leave as is )
 char_map = {
@@ -71,18 +71,16 @@ char_map = {
 }
 
 
-def replace_char(m):
-    """Replace a char with a corresponding char."""
-    char = m.group()
-    if char in char_map:
-        return char_map[char]
-    else:
-        return char
+translation_table = str.maketrans(char_map)
 
 
+@lru_cache(maxsize=1024)
 def slughifi(value):
     """High Fidelity slugify."""
-    # try to replace chars
-    value = re.sub('[^a-zA-Z0-9\\s\\-]{1}', replace_char, value)
+    # replace chars from the map, then drop anything that isn't ascii
+    return value.translate(translation_table).encode('ascii', 'ignore')
 
-    return value.encode('ascii', 'ignore')
+
+def slughifi_many(values):
+    """Slugify many values at once, the results are returned in the same order."""
+    return [slughifi(value) for value in values]
@@ -0,0 +1,43 @@
+import json
+
+from .conf import TEAMS_CONFIG_PATH
+from .utils import get_value_from_redis, set_key_in_redis
+
+TEAMS_KEY = 'teams'
+
+
+def get_teams() -> list:
+    """
+    Return the configured teams.
+
+    A team is a dict with the `channel_id` where its reminders are posted and either the number of its `sprint` or
+    the id of its `board`, in which case the board's active sprint is reported. Teams are taken from Redis and, when
+    they aren't set there, from the JSON file under TEAMS_CONFIG_PATH.
+    """
+    teams = get_value_from_redis(TEAMS_KEY)
+    if teams is None and TEAMS_CONFIG_PATH:
+        with open(TEAMS_CONFIG_PATH) as config:
+            teams = json.load(config)
+    return validate_teams(teams or [])
+
+
+def set_teams(teams: list) -> None:
+    """
+    Store the teams in Redis.
+
+    :param teams: a list of teams as described in `get_teams`
+    """
+    set_key_in_redis(TEAMS_KEY, validate_teams(teams))
+
+
+def validate_teams(teams: list) -> list:
+    """
+    Return the given teams if every team is valid.
+
+    :param teams: a list of teams as described in `get_teams`
+    :raises ValueError: when a team doesn't have a channel or neither a sprint nor a board
+    """
+    for team in teams:
+        if not team.get('channel_id') or not (team.get('sprint') or team.get('board')):
+            raise ValueError(f'A team requires a channel_id and a sprint or a board, got: {team}')
+    return teams
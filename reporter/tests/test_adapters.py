@@ -1,13 +1,31 @@
+import asyncio
 from json.decoder import JSONDecodeError
-from unittest import TestCase
-from unittest.mock import patch
 from urllib.parse import urljoin
 
-from requests.exceptions import ConnectionError, Timeout
-from responses import RequestsMock
+from aiohttp import ClientConnectionError, ClientSession
+from asynctest import ANY, CoroutineMock, MagicMock, TestCase, patch
+from fakeredis import FakeRedis
 
-from ..adapters import BaseAdapter
-from ..exceptions import ResponseStatusCodeException
+from ..adapters import BaseAdapter, JiraAdapter
+from ..exceptions import CircuitOpenException, ResponseStatusCodeException
+from ..factories.bitbucket import BitBucketResponseFactory
+from ..factories.jira import JiraIssueFactory, JiraResponseFactory
+from ..limiters import (
+    AdaptiveTimeout,
+    CircuitBreaker,
+    ConcurrencyLimiter,
+    TokenBucket,
+)
+from ..sessions import close_session
+
+
+def make_response(status: int = 200, json=None, headers: dict = None) -> MagicMock:
+    """Return a mock of an aiohttp response context manager."""
+    response = MagicMock()
+    response.__aenter__.return_value.status = status
+    response.__aenter__.return_value.headers = headers or {}
+    response.__aenter__.return_value.json = CoroutineMock(return_value=json)
+    return response
 
 
 class TestBaseAdapter(TestCase):
@@ -16,67 +34,52 @@ class TestBaseAdapter(TestCase):
     @classmethod
     def setUpClass(cls):
         """Set up class fixture before running tests in the class."""
-        cls.responses = RequestsMock()
         cls.domain = 'https://example.com'
         cls.path = 'example_path/'
 
     def setUp(self):
         """Set up the test fixture before exercising it."""
-        self.adapter = BaseAdapter(domain=self.domain)
+        self.transport = MagicMock()
+        self.adapter = BaseAdapter(domain=self.domain, transport=self.transport)
 
         self.addCleanup(patch.stopall)
-        self.addCleanup(self.responses.reset)
-        self.responses.start()
-
-    def tearDown(self):
-        """Deconstruct the test fixture after testing it."""
-        self.responses.stop()
 
-    def test_get_raises_ConnectionError(self):
-        """Test if a ConnectionError was raised."""
-        expected_message = 'ERROR:reporter:BaseAdapter (https://example.com/example_path/): An ConnectionError occurred'
+    async def test_get_raises_ClientConnectionError(self):
+        """Test if a ClientConnectionError was raised."""
+        self.transport.get.side_effect = ClientConnectionError()
+        expected_message = 'ERROR:reporter:BaseAdapter (https://example.com/example_path/): ' \
+                           'An ClientConnectionError occurred'
 
         with self.assertLogs('reporter', 'ERROR') as cm:
-            with self.assertRaises(ConnectionError):
-                self.adapter._get(self.path)
+            with self.assertRaises(ClientConnectionError):
+                await self.adapter._get(self.path)
         self.assertEqual(cm.output[0], expected_message)
 
-    def test_get_raises_Timeout(self):
-        """Test if a Timeout was raised."""
-        self.responses.add(
-            self.responses.GET,
-            urljoin(self.adapter.domain, self.path),
-            body=Timeout(),
-        )
-        expected_message = 'ERROR:reporter:BaseAdapter (https://example.com/example_path/): An Timeout occurred'
+    async def test_get_raises_TimeoutError(self):
+        """Test if a TimeoutError was raised."""
+        self.transport.get.return_value.__aenter__.side_effect = asyncio.TimeoutError()
+        expected_message = 'ERROR:reporter:BaseAdapter (https://example.com/example_path/): An TimeoutError occurred'
 
         with self.assertLogs('reporter', 'ERROR') as cm:
-            with self.assertRaises(Timeout):
-                self.adapter._get(self.path)
+            with self.assertRaises(asyncio.TimeoutError):
+                await self.adapter._get(self.path)
         self.assertEqual(cm.output[0], expected_message)
 
-    def test_get_raises_error_when_response_isnt_a_valid_json(self):
+    async def test_get_raises_error_when_response_isnt_a_valid_json(self):
         """Test if an error was raised when response isn't a valid json."""
-        self.responses.add(
-            self.responses.GET,
-            urljoin(self.adapter.domain, self.path),
-            body='test',
-        )
+        self.transport.get.return_value = make_response()
+        self.transport.get.return_value.__aenter__.return_value.json.side_effect = JSONDecodeError('', 'test', 0)
         expected_message = "ERROR:reporter:BaseAdapter (https://example.com/example_path/): response isn't a valid json"
 
         with self.assertLogs('reporter', 'ERROR') as cm:
             with self.assertRaises(JSONDecodeError):
-                self.adapter._get(self.path)
+                await self.adapter._get(self.path)
         self.assertEqual(cm.output[0], expected_message)
 
-    def test_get_raises_error_when_status_code_isnt_200(self):
+    async def test_get_raises_error_when_status_code_isnt_200(self):
         """Test if an error was raised when status_code isn't 200."""
         status_code = 404
-        self.responses.add(
-            self.responses.GET,
-            urljoin(self.domain, self.path),
-            status=status_code,
-        )
+        self.transport.get.return_value = make_response(status=status_code)
         expected_log_message = f'ERROR:reporter:' \
                                f'BaseAdapter (https://example.com/example_path/): ' \
                                f'response returned status_code={status_code}'
@@ -84,18 +87,321 @@ class TestBaseAdapter(TestCase):
 
         with self.assertLogs('reporter', 'ERROR') as cm:
             with self.assertRaisesRegex(ResponseStatusCodeException, expected_message):
-                self.adapter._get(self.path)
+                await self.adapter._get(self.path)
         self.assertEqual(cm.output[0], expected_log_message)
 
-    def test_get_returns_json(self):
+    async def test_get_returns_json(self):
         """Test if a json is returned."""
         expected_json = {'test': 1}
-        self.responses.add(
-            self.responses.GET,
-            urljoin(self.adapter.domain, self.path),
-            json=expected_json,
-        )
+        self.transport.get.return_value = make_response(json=expected_json)
 
-        response = self.adapter._get(self.path)
+        response = await self.adapter._get(self.path)
 
         self.assertEqual(expected_json, response)
+        self.transport.get.assert_called_once_with(
+            urljoin(self.domain, self.path),
+            params=None,
+            auth=None,
+            headers=None,
+        )
+
+
+class TestJiraAdapter(TestCase):
+    """TestCase for JiraAdapter."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up class fixture before running tests in the class."""
+        cls.sprint = 388
+        cls.fake_redis = FakeRedis()
+
+    def setUp(self):
+        """Set up the test fixture before exercising it."""
+        self.adapter = JiraAdapter(self.sprint)
+
+        self.addCleanup(patch.stopall)
+        patch.object(JiraAdapter, 'retry_backoff', 0).start()
+        patch.object(JiraAdapter, 'timeout', AdaptiveTimeout(initial=10, minimum=1, maximum=30)).start()
+        patch.object(JiraAdapter, 'circuit_breaker', CircuitBreaker(failure_threshold=3, reset_timeout=30)).start()
+        patch.object(JiraAdapter, 'rate_limiter', TokenBucket(rate=100)).start()
+        patch.object(JiraAdapter, 'concurrency_limiter', ConcurrencyLimiter(2)).start()
+        patch('reporter.utils.get_redis_instance', return_value=self.fake_redis).start()
+
+    def tearDown(self):
+        """Deconstruct the test fixture after testing it."""
+        self.fake_redis.flushall()
+        self.loop.run_until_complete(close_session())
+
+    async def test_get_sprint_board_issues_follows_pagination(self):
+        """Test if all pages of the sprint board were fetched and yielded in order."""
+        issues = JiraIssueFactory.create_batch(size=5)
+        pages = {
+            start: JiraResponseFactory.create(
+                startAt=start,
+                maxResults=2,
+                total=len(issues),
+                issues=issues[start:start + 2],
+            ) for start in range(0, len(issues), 2)
+        }
+        patch.object(
+            ClientSession,
+            'get',
+            side_effect=lambda url, params, **kwargs: make_response(json=pages[params['startAt']]),
+        ).start()
+
+        pages = [page async for page in self.adapter.get_sprint_board_issues()]
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(
+            [issue['key'] for page in pages for issue in page],
+            [issue['key'] for issue in issues],
+        )
+
+    async def test_get_pull_requests_retries_throttled_requests(self):
+        """Test if a throttled dev-status request was retried after the Retry-After time."""
+        issue = {'id': '1', 'key': 'EX-1', 'title': 'Example', 'status': 'In Review', 'self': ''}
+        m_get = patch.object(
+            ClientSession,
+            'get',
+            side_effect=[
+                make_response(status=429, headers={'Retry-After': '0'}),
+                make_response(json=BitBucketResponseFactory.create()),
+            ],
+        ).start()
+        m_pause = patch.object(self.adapter.rate_limiter, 'pause').start()
+
+        with self.assertLogs('reporter', 'WARNING'):
+            await self.adapter.get_pull_requests([issue])
+
+        self.assertEqual(m_get.call_count, 2)
+        m_pause.assert_called_once_with(0)
+
+    async def test_get_pull_requests_replays_cached_response_when_not_modified(self):
+        """Test if a 304 response for dev-status was answered with the cached content."""
+        issue = {'id': '1', 'key': 'EX-1', 'title': 'Example', 'status': 'In Review', 'self': ''}
+        content = BitBucketResponseFactory.create()
+        m_get = patch.object(
+            ClientSession,
+            'get',
+            side_effect=[
+                make_response(json=content, headers={'ETag': '"v1"'}),
+                make_response(status=304, headers={'ETag': '"v1"'}),
+            ],
+        ).start()
+
+        first = await self.adapter.get_pull_requests([issue])
+        second = await self.adapter.get_pull_requests([issue])
+
+        self.assertEqual(first, second)
+        m_get.assert_called_with(ANY, params=ANY, auth=ANY, headers={'If-None-Match': '"v1"'}, timeout=ANY)
+
+    async def test_get_active_sprint_returns_the_boards_active_sprint(self):
+        """Test if the number of the board's active sprint was returned."""
+        adapter = JiraAdapter(board=12)
+        m_get = patch.object(
+            ClientSession,
+            'get',
+            return_value=make_response(json={'values': [{'id': 412, 'state': 'active'}]}),
+        ).start()
+
+        sprint = await adapter.get_active_sprint()
+
+        self.assertEqual(sprint, 412)
+        m_get.assert_called_once_with(
+            urljoin(adapter.domain, 'agile/1.0/board/12/sprint'),
+            params={'state': 'active'},
+            auth=ANY,
+            headers=ANY,
+            timeout=ANY,
+        )
+
+    async def test_get_active_sprint_raises_when_board_has_no_active_sprint(self):
+        """Test if ValueError was raised when the board doesn't have an active sprint."""
+        adapter = JiraAdapter(board=12)
+        patch.object(ClientSession, 'get', return_value=make_response(json={'values': []})).start()
+
+        with self.assertRaises(ValueError):
+            await adapter.get_active_sprint()
+
+    async def test_filter_issues_with_open_pull_requests_drops_issues_without_them(self):
+        """Test if issues whose development summary doesn't show open pull requests were dropped."""
+        issues = [{'id': str(number)} for number in range(1, 4)]
+        open_summary = '{pullrequest={dataType=pullrequest, state=OPEN, stateCount=1}, json={}}'
+        pages = {
+            0: {'startAt': 0, 'total': 3, 'issues': [
+                {'id': '1', 'fields': {'customfield_10000': open_summary}},
+                {'id': '2', 'fields': {'customfield_10000': '{}'}},
+            ]},
+            2: {'startAt': 2, 'total': 3, 'issues': [
+                {'id': '3', 'fields': {'customfield_10000': open_summary}},
+            ]},
+        }
+        patch.object(JiraAdapter, 'development_field', 'customfield_10000').start()
+        m_get = patch.object(
+            ClientSession,
+            'get',
+            side_effect=lambda url, params, **kwargs: make_response(json=pages[params['startAt']]),
+        ).start()
+
+        filtered = await self.adapter.filter_issues_with_open_pull_requests(issues)
+
+        self.assertEqual(filtered, [{'id': '1'}, {'id': '3'}])
+        self.assertEqual(m_get.call_count, 2)
+        self.assertEqual(m_get.call_args[1]['params']['jql'], 'id in (1,2,3)')
+
+    async def test_filter_issues_with_open_pull_requests_returns_issues_without_development_field(self):
+        """Test if issues were returned without any request when the development field isn't set."""
+        issues = [{'id': '1'}]
+        m_get = patch.object(ClientSession, 'get').start()
+
+        filtered = await self.adapter.filter_issues_with_open_pull_requests(issues)
+
+        self.assertEqual(filtered, issues)
+        m_get.assert_not_called()
+
+    async def test_get_development_field_looks_the_field_up_once(self):
+        """Test if the development field was looked up among Jira's fields and remembered for next calls."""
+        fields = [
+            {'id': 'summary', 'name': 'Summary', 'schema': {'type': 'string', 'system': 'summary'}},
+            {
+                'id': 'customfield_10000',
+                'name': 'Development',
+                'schema': {
+                    'type': 'any',
+                    'custom': 'com.atlassian.jira.plugins.jira-development-integration-plugin:devsummarycf',
+                },
+            },
+        ]
+        patch.object(JiraAdapter, 'development_field', None).start()
+        m_get = patch.object(ClientSession, 'get', return_value=make_response(json=fields)).start()
+
+        self.assertEqual(await self.adapter.get_development_field(), 'customfield_10000')
+        self.assertEqual(await JiraAdapter(board=12).get_development_field(), 'customfield_10000')
+
+        m_get.assert_called_once()
+        self.assertEqual(m_get.call_args[0][0], 'https://empsgourp.atlassian.net/rest/api/2/field')
+
+    async def test_get_development_field_looks_the_field_up_again_after_a_failure(self):
+        """Test if the development field wasn't remembered when Jira's fields couldn't be fetched."""
+        patch.object(JiraAdapter, 'development_field', None).start()
+        m_get = patch.object(
+            ClientSession,
+            'get',
+            side_effect=[make_response(status=403), make_response(json=[{'id': 'summary', 'name': 'Summary'}])],
+        ).start()
+
+        with self.assertLogs('reporter', 'WARNING'):
+            self.assertIsNone(await self.adapter.get_development_field())
+        self.assertEqual(await self.adapter.get_development_field(), '')
+
+        self.assertEqual(m_get.call_count, 2)
+
+    async def test_get_retries_failed_connections_and_server_errors(self):
+        """Test if requests that failed to connect or got a server error were retried."""
+        m_get = patch.object(
+            ClientSession,
+            'get',
+            side_effect=[
+                ClientConnectionError(),
+                make_response(status=503),
+                make_response(json={'values': [{'id': 412}]}),
+            ],
+        ).start()
+        m_pause = patch.object(self.adapter.rate_limiter, 'pause').start()
+
+        with self.assertLogs('reporter', 'WARNING'):
+            sprint = await JiraAdapter(board=12).get_active_sprint()
+
+        self.assertEqual(sprint, 412)
+        self.assertEqual(m_get.call_count, 3)
+        self.assertEqual(self.adapter.circuit_breaker.failures, 0)
+        # Failures of one request don't hold back the requests of other issues or teams.
+        m_pause.assert_not_called()
+
+    async def test_get_sends_requests_with_adaptive_timeout(self):
+        """Test if requests were sent with the current value of the adaptive timeout."""
+        m_get = patch.object(ClientSession, 'get', return_value=make_response(json={'values': [{'id': 412}]})).start()
+
+        await JiraAdapter(board=12).get_active_sprint()
+
+        self.assertEqual(m_get.call_args[1]['timeout'].total, 10)
+        self.assertLess(JiraAdapter.timeout.value, 10)
+
+    async def test_get_fails_fast_when_circuit_is_open(self):
+        """Test if no request was sent while the circuit is open."""
+        m_get = patch.object(ClientSession, 'get', side_effect=ClientConnectionError()).start()
+
+        with self.assertLogs('reporter', 'WARNING'):
+            with self.assertRaises(CircuitOpenException):
+                await JiraAdapter(board=12).get_active_sprint()
+
+        self.assertEqual(m_get.call_count, 3)
+
+    async def test_get_pull_requests_returns_pull_requests_of_issues_that_did_not_fail(self):
+        """Test if pull requests of other issues were returned when requests of one issue failed."""
+        issues = [
+            {'id': str(number), 'key': f'EX-{number}', 'title': 'Example', 'status': 'In Review', 'self': ''}
+            for number in (1, 2)
+        ]
+        content = BitBucketResponseFactory.create()
+        patch.object(
+            ClientSession,
+            'get',
+            side_effect=lambda url, params, **kwargs: (
+                make_response(json=content) if params['issueId'] == '1' else make_response(status=404)
+            ),
+        ).start()
+
+        with self.assertLogs('reporter', 'ERROR'):
+            pull_requests = await self.adapter.get_pull_requests_per_issue(issues)
+
+        self.assertIsNotNone(pull_requests[0])
+        self.assertIsNone(pull_requests[1])
+
+    def _track_requests_in_flight(self) -> dict:
+        """Mock dev-status requests that take a while and return how many of them were in flight at most."""
+        response = make_response(json=BitBucketResponseFactory.create()).__aenter__.return_value
+        in_flight = {'now': 0, 'max': 0}
+
+        async def send_request(*args):
+            in_flight['now'] += 1
+            in_flight['max'] = max(in_flight['max'], in_flight['now'])
+            await asyncio.sleep(0.01)
+            return response
+
+        async def receive_response(*args):
+            in_flight['now'] -= 1
+
+        patch.object(
+            ClientSession,
+            'get',
+            side_effect=lambda *args, **kwargs: MagicMock(__aenter__=send_request, __aexit__=receive_response),
+        ).start()
+        return in_flight
+
+    @staticmethod
+    def _make_issues(prefix: str) -> list:
+        return [
+            {'id': f'{prefix}{number}', 'key': f'EX-{prefix}{number}', 'title': 'Example', 'status': 'In Review'}
+            for number in range(4)
+        ]
+
+    async def test_get_pull_requests_per_issue_limits_concurrency_across_pages(self):
+        """Test if pages looked up concurrently didn't exceed the concurrency limit together."""
+        in_flight = self._track_requests_in_flight()
+
+        await asyncio.gather(*(self.adapter.get_pull_requests_per_issue(self._make_issues(page)) for page in 'ABC'))
+
+        self.assertEqual(in_flight['max'], 2)
+
+    async def test_adapters_of_many_boards_share_rate_and_concurrency_limits(self):
+        """Test if adapters of different boards, e.g. of teams, shared the limits of the Jira account."""
+        in_flight = self._track_requests_in_flight()
+        adapters = [JiraAdapter(self.sprint, board=board) for board in (1, 2, 3)]
+
+        await asyncio.gather(*(
+            adapter.get_pull_requests_per_issue(self._make_issues(str(adapter.board))) for adapter in adapters
+        ))
+
+        self.assertEqual(in_flight['max'], 2)
+        self.assertIs(adapters[0].rate_limiter, adapters[1].rate_limiter)
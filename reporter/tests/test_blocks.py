@@ -0,0 +1,39 @@
+from unittest import TestCase
+
+from .. import blocks
+
+
+class BlocksTestCase(TestCase):
+    """TestCase for block builders."""
+
+    def test_builder_returns_a_fresh_copy_of_the_template(self):
+        """Test if modifying a built block doesn't change blocks built later."""
+        first = blocks.title('first')
+        second = blocks.title('second')
+
+        first['text']['type'] = 'plain_text'
+
+        self.assertEqual(second, {'type': 'section', 'text': {'type': 'mrkdwn', 'text': 'second'}})
+        self.assertEqual(blocks.load_template('title.json')['text']['text'], '')
+
+    def test_template_is_loaded_once(self):
+        """Test if a template is read from disk only once."""
+        blocks.load_template.cache_clear()
+        blocks.get_builder.cache_clear()
+
+        for _ in range(3):
+            blocks.description('text', 'https://example.com')
+
+        self.assertEqual(blocks.load_template.cache_info().misses, 1)
+
+    def test_no_pull_requests_contains_version(self):
+        """Test if the no pull requests message contains the given version."""
+        message = blocks.no_pull_requests('*version:* 1.0.0')
+
+        self.assertEqual(message['blocks'][1]['elements'][1]['text'], '*version:* 1.0.0')
+
+    def test_notice_contains_text(self):
+        """Test if the notice block contains the given text."""
+        block = blocks.notice('_old report_')
+
+        self.assertEqual(block, {'type': 'context', 'elements': [{'type': 'mrkdwn', 'text': '_old report_'}]})
@@ -1,10 +1,13 @@
+import asyncio
+from functools import partial
+import json
+from time import time
 from unittest.mock import ANY
 
 from aiohttp import ClientSession
 from asynctest import CoroutineMock, MagicMock, TestCase, patch
 from factory import Iterator
 from fakeredis import FakeRedis
-from responses import RequestsMock
 from slack_sdk.web.async_client import AsyncWebClient
 
 from ..bridge import Bridge
@@ -26,6 +29,8 @@ from ..factories.slack import (
     SectionButtonFactory,
     SlackMessageFactory,
 )
+from ..messages import MessagePacker
+from ..sessions import close_session
 
 
 class TestIntegrity(TestCase):
@@ -39,25 +44,36 @@ class TestIntegrity(TestCase):
         cls.jira_dev_tools_api_url = 'https://empsgourp.atlassian.net/rest/dev-status/1.0/issue/detail'
 
         cls.fake_redis = FakeRedis()
-        cls.responses = RequestsMock()
 
     def setUp(self):
         """Set up the test fixture before exercising it."""
         self.addCleanup(patch.stopall)
-        self.addCleanup(self.responses.reset)
-        self.responses.start()
+        self.payloads = {}
         patch('reporter.utils.get_redis_instance', return_value=self.fake_redis).start()
         self.patcher = patch.object(AsyncWebClient, 'chat_postMessage', new=CoroutineMock())
         self.chat_postMessage = self.patcher.start()
         patch.object(AsyncWebClient, 'users_list', new=CoroutineMock(return_value=self._get_users_list())).start()
-        self.m_get = patch.object(ClientSession, 'get', return_value=MagicMock()).start()
+        self.m_get = patch.object(ClientSession, 'get', side_effect=self._get_response).start()
+        patch('reporter.adapters.JiraAdapter.development_field', '').start()
 
         self.bridge = Bridge(self.sprint)
 
     def tearDown(self):
         """Deconstruct the test fixture after testing it."""
-        self.responses.stop()
         self.fake_redis.flushall()
+        self.loop.run_until_complete(close_session())
+
+    def _add_response(self, url: str, *payloads: dict) -> None:
+        """Queue JSON payloads that will be returned one by one for GET requests to a given url."""
+        self.payloads.setdefault(url, []).extend(payloads)
+
+    def _get_response(self, url: str, **kwargs) -> MagicMock:
+        """Return a mock of an aiohttp response with the next payload queued for a given url."""
+        response = MagicMock()
+        response.__aenter__.return_value.status = 200
+        response.__aenter__.return_value.headers = {}
+        response.__aenter__.return_value.json = CoroutineMock(return_value=self.payloads[url].pop(0))
+        return response
 
     @staticmethod
     def _get_users_list():
@@ -123,12 +139,8 @@ class TestIntegrity(TestCase):
                 BitBucketIssueFactory.create(pullRequests=[]),
             ],
         )
-        self.responses.add(
-            self.responses.GET,
-            jira_sprint_api_url,
-            json=jira_issue,
-        )
-        self.m_get.return_value.__aenter__.return_value.json = CoroutineMock(return_value=bitbucket_issue)
+        self._add_response(jira_sprint_api_url, jira_issue)
+        self._add_response(self.jira_dev_tools_api_url, bitbucket_issue)
         expected_message = self._get_expected_no_pull_request_message()
         bridge = Bridge()
 
@@ -155,12 +167,8 @@ class TestIntegrity(TestCase):
                 BitBucketIssueFactory.create(pullRequests=[]),
             ],
         )
-        self.responses.add(
-            self.responses.GET,
-            jira_sprint_api_url,
-            json=jira_issue,
-        )
-        self.m_get.return_value.__aenter__.return_value.json = CoroutineMock(return_value=bitbucket_issue)
+        self._add_response(jira_sprint_api_url, jira_issue)
+        self._add_response(self.jira_dev_tools_api_url, bitbucket_issue)
         expected_message = self._get_expected_no_pull_request_message()
         bridge = Bridge()
 
@@ -185,12 +193,8 @@ class TestIntegrity(TestCase):
                 BitBucketIssueFactory.create(pullRequests=[]),
             ],
         )
-        self.responses.add(
-            self.responses.GET,
-            self.jira_sprint_api_url,
-            json=jira_issue,
-        )
-        self.m_get.return_value.__aenter__.return_value.json = CoroutineMock(return_value=bitbucket_issue)
+        self._add_response(self.jira_sprint_api_url, jira_issue)
+        self._add_response(self.jira_dev_tools_api_url, bitbucket_issue)
         expected_message = self._get_expected_no_pull_request_message()
 
         self.loop.run_until_complete(self.bridge.run())
@@ -219,12 +223,8 @@ class TestIntegrity(TestCase):
             ],
         )
         bitbucket_response = BitBucketResponseFactory.create(detail=[bitbucket_issue])
-        self.responses.add(
-            self.responses.GET,
-            self.jira_sprint_api_url,
-            json=jira_response,
-        )
-        self.m_get.return_value.__aenter__.return_value.json = CoroutineMock(return_value=bitbucket_response)
+        self._add_response(self.jira_sprint_api_url, jira_response)
+        self._add_response(self.jira_dev_tools_api_url, bitbucket_response)
         expected_message = SlackMessageFactory.create(
             blocks=[
                 SectionBlockFactory.create(
@@ -273,12 +273,8 @@ class TestIntegrity(TestCase):
             ),
         )
         bitbucket_response = BitBucketResponseFactory.create(detail=[bitbucket_issue])
-        self.responses.add(
-            self.responses.GET,
-            self.jira_sprint_api_url,
-            json=jira_response,
-        )
-        self.m_get.return_value.__aenter__.return_value.json = CoroutineMock(return_value=bitbucket_response)
+        self._add_response(self.jira_sprint_api_url, jira_response)
+        self._add_response(self.jira_dev_tools_api_url, bitbucket_response)
         expected_message = SlackMessageFactory.create(
             blocks=[
                 SectionBlockFactory.create(text__text=':bell:  *Pull requests report*  :bell:', text__type='mrkdwn'),
@@ -329,12 +325,8 @@ class TestIntegrity(TestCase):
                 [bitbucket_issues[1]],
             ]),
         )
-        self.responses.add(
-            self.responses.GET,
-            self.jira_sprint_api_url,
-            json=jira_issues,
-        )
-        self.m_get.return_value.__aenter__.return_value.json = CoroutineMock(side_effect=bitbucket_responses)
+        self._add_response(self.jira_sprint_api_url, jira_issues)
+        self._add_response(self.jira_dev_tools_api_url, *bitbucket_responses)
         expected_message = self._get_expected_no_pull_request_message()
 
         self.loop.run_until_complete(self.bridge.run())
@@ -371,12 +363,8 @@ class TestIntegrity(TestCase):
                 [bitbucket_issues[1]],
             ]),
         )
-        self.responses.add(
-            self.responses.GET,
-            self.jira_sprint_api_url,
-            json=jira_response,
-        )
-        self.m_get.return_value.__aenter__.return_value.json = CoroutineMock(side_effect=bitbucket_responses)
+        self._add_response(self.jira_sprint_api_url, jira_response)
+        self._add_response(self.jira_dev_tools_api_url, *bitbucket_responses)
         expected_message = SlackMessageFactory.create(
             blocks=[
                 SectionBlockFactory.create(text__text=':bell:  *Pull requests report*  :bell:', text__type='mrkdwn'),
@@ -441,12 +429,8 @@ class TestIntegrity(TestCase):
                 [bitbucket_issues[1]],
             ]),
         )
-        self.responses.add(
-            self.responses.GET,
-            self.jira_sprint_api_url,
-            json=jira_response,
-        )
-        self.m_get.return_value.__aenter__.return_value.json = CoroutineMock(side_effect=bitbucket_responses)
+        self._add_response(self.jira_sprint_api_url, jira_response)
+        self._add_response(self.jira_dev_tools_api_url, *bitbucket_responses)
         expected_message = SlackMessageFactory.create(
             blocks=[
                 SectionBlockFactory.create(text__text=':bell:  *Pull requests report*  :bell:', text__type='mrkdwn'),
@@ -492,3 +476,448 @@ class TestIntegrity(TestCase):
         self.loop.run_until_complete(self.bridge.run())
 
         self.chat_postMessage.assert_awaited_once_with(channel=ANY, **expected_message)
+
+    def test_post_serves_issues_that_were_not_updated_from_the_sprint_snapshot(self):
+        """
+        Test a situation where the sprint board didn't change between two runs.
+
+        In this situation the second run should take pull requests from the sprint's snapshot instead of asking the
+        dev-status API again and send the same message to slack.
+        """
+        jira_response = JiraResponseFactory.create(
+            issues=[
+                JiraIssueFactory.create(fields__status=StatusFactory.create(name='In Review')),
+            ],
+        )
+        bitbucket_response = BitBucketResponseFactory.create(
+            detail=[
+                BitBucketIssueFactory.create(
+                    pullRequests=[
+                        PullRequestFactory.create(
+                            status='OPEN',
+                            reviewers=ReviewerFactory.create_batch(3, approved=False),
+                        ),
+                    ],
+                ),
+            ],
+        )
+        self._add_response(self.jira_sprint_api_url, jira_response, jira_response)
+        self._add_response(self.jira_dev_tools_api_url, bitbucket_response)
+
+        self.loop.run_until_complete(self.bridge.run())
+        self.fake_redis.delete(f'sprint-report:{self.sprint}:result')
+        self.loop.run_until_complete(Bridge(self.sprint).run())
+
+        self.assertEqual(self.m_get.call_count, 3)
+        first_message, second_message = self.chat_postMessage.await_args_list
+        self.assertEqual(first_message, second_message)
+
+    def test_post_revalidates_issues_whose_snapshot_is_older_than_max_age(self):
+        """
+        Test a situation where the sprint board didn't change but the snapshot is older than its max age.
+
+        In this situation the second run should ask the dev-status API again, because a review or a merged pull
+        request doesn't change the issue's `updated` field, and report the current pull requests.
+        """
+        jira_response = JiraResponseFactory.create(
+            issues=[
+                JiraIssueFactory.create(fields__status=StatusFactory.create(name='In Review')),
+            ],
+        )
+        bitbucket_response = BitBucketResponseFactory.create(
+            detail=[
+                BitBucketIssueFactory.create(
+                    pullRequests=[
+                        PullRequestFactory.create(
+                            status='OPEN',
+                            reviewers=ReviewerFactory.create_batch(3, approved=False),
+                        ),
+                    ],
+                ),
+            ],
+        )
+        merged_response = BitBucketResponseFactory.create(
+            detail=[BitBucketIssueFactory.create(pullRequests=[PullRequestFactory.create(status='MERGED')])],
+        )
+        self._add_response(self.jira_sprint_api_url, jira_response, jira_response)
+        self._add_response(self.jira_dev_tools_api_url, bitbucket_response, merged_response)
+
+        self.loop.run_until_complete(self.bridge.run())
+        self.fake_redis.delete(f'sprint-report:{self.sprint}:result')
+        with patch('reporter.apps.JiraApp.snapshot_max_age', 0):
+            self.loop.run_until_complete(Bridge(self.sprint).run())
+
+        self.assertEqual(self.m_get.call_count, 4)
+        first_message, second_message = self.chat_postMessage.await_args_list
+        self.assertNotEqual(first_message, second_message)
+
+    @patch('reporter.adapters.JiraAdapter.cache_ttl', 0)
+    def test_post_sends_a_message_to_slack_without_response_cache(self):
+        """
+        Test a situation where the response cache is turned off with a TTL of 0.
+
+        In this situation the sprint's snapshot should still be stored and the message sent to slack.
+        """
+        jira_response = JiraResponseFactory.create(
+            issues=[
+                JiraIssueFactory.create(fields__status=StatusFactory.create(name='In Review')),
+            ],
+        )
+        self._add_response(self.jira_sprint_api_url, jira_response)
+        self._add_response(self.jira_dev_tools_api_url, BitBucketResponseFactory.create())
+
+        self.loop.run_until_complete(self.bridge.run())
+
+        self.chat_postMessage.assert_awaited_once()
+        self.assertTrue(self.fake_redis.exists(f'sprint-snapshot:{self.sprint}'))
+
+    @patch('reporter.adapters.JiraAdapter.development_field', 'customfield_10000')
+    def test_post_asks_for_details_only_issues_with_open_pull_requests(self):
+        """
+        Test a situation where the development field is configured and only one of two issues has open pull requests.
+
+        In this situation pull requests' details should be requested only for the issue with open pull requests.
+        """
+        issues = JiraIssueFactory.create_batch(2, fields__status=StatusFactory.create(name='In Review'))
+        self._add_response(self.jira_sprint_api_url, JiraResponseFactory.create(issues=issues))
+        self._add_response('https://empsgourp.atlassian.net/rest/api/2/search', {
+            'startAt': 0,
+            'total': 2,
+            'issues': [
+                {
+                    'id': issues[0]['id'],
+                    'fields': {'customfield_10000': '{pullrequest={dataType=pullrequest, state=OPEN, stateCount=1}}'},
+                },
+                {'id': issues[1]['id'], 'fields': {'customfield_10000': '{}'}},
+            ],
+        })
+        self._add_response(
+            self.jira_dev_tools_api_url,
+            BitBucketResponseFactory.create(detail=[BitBucketIssueFactory.create(pullRequests=[])]),
+        )
+
+        self.loop.run_until_complete(self.bridge.run())
+
+        self.assertEqual(
+            [call[0][0] for call in self.m_get.call_args_list],
+            [self.jira_sprint_api_url, 'https://empsgourp.atlassian.net/rest/api/2/search', self.jira_dev_tools_api_url],
+        )
+        self.assertEqual(self.m_get.call_args_list[2][1]['params']['issueId'], issues[0]['id'])
+
+    def test_concurrent_runs_for_the_same_sprint_share_one_report(self):
+        """
+        Test a situation where the report of the same sprint is requested from two channels at once.
+
+        In this situation Jira should be asked only once and the same message should be sent to both channels.
+        """
+        jira_response = JiraResponseFactory.create(
+            issues=[
+                JiraIssueFactory.create(fields__status=StatusFactory.create(name='In Review')),
+            ],
+        )
+        bitbucket_response = BitBucketResponseFactory.create(
+            detail=[
+                BitBucketIssueFactory.create(
+                    pullRequests=[
+                        PullRequestFactory.create(
+                            status='OPEN',
+                            reviewers=ReviewerFactory.create_batch(3, approved=False),
+                        ),
+                    ],
+                ),
+            ],
+        )
+        self._add_response(self.jira_sprint_api_url, jira_response)
+        self._add_response(self.jira_dev_tools_api_url, bitbucket_response)
+
+        self.loop.run_until_complete(asyncio.gather(
+            Bridge(self.sprint, channel_id='channel1').run(),
+            Bridge(self.sprint, channel_id='channel2').run(),
+        ))
+
+        self.assertEqual(self.m_get.call_count, 2)
+        first_message, second_message = self.chat_postMessage.await_args_list
+        self.assertEqual({first_message[1]['channel'], second_message[1]['channel']}, {'channel1', 'channel2'})
+        self.assertEqual(first_message[1]['blocks'], second_message[1]['blocks'])
+
+    @patch('reporter.apps.MessagePacker', partial(MessagePacker, max_blocks=6))
+    def test_run_posts_messages_while_the_report_is_rendered(self):
+        """
+        Test a situation where the report of the sprint doesn't fit in one message.
+
+        In this situation the first message should be posted before the whole report is rendered and stored.
+        """
+        issues = JiraIssueFactory.create_batch(2, fields__status=StatusFactory.create(name='In Review'))
+        bitbucket_response = BitBucketResponseFactory.create(
+            detail=[BitBucketIssueFactory.create(pullRequests=[PullRequestFactory.create(status='OPEN')])],
+        )
+        self._add_response(self.jira_sprint_api_url, JiraResponseFactory.create(issues=issues))
+        self._add_response(self.jira_dev_tools_api_url, bitbucket_response, bitbucket_response)
+        report_stored = []
+        self.chat_postMessage.side_effect = lambda **kwargs: report_stored.append(
+            bool(self.fake_redis.exists(f'sprint-report:{self.sprint}')),
+        )
+
+        self.loop.run_until_complete(self.bridge.run())
+
+        self.assertGreater(len(report_stored), 1)
+        self.assertFalse(report_stored[0])
+        report = json.loads(self.fake_redis.get(f'sprint-report:{self.sprint}'))
+        self.assertEqual(len(report['messages']), len(report_stored))
+
+    def test_report_is_reused_by_a_run_shortly_after(self):
+        """
+        Test a situation where a sprint's report is requested shortly after it was sent.
+
+        In this situation the rendered report should be sent again without asking Jira.
+        """
+        jira_response = JiraResponseFactory.create(
+            issues=[
+                JiraIssueFactory.create(fields__status=StatusFactory.create(name='In Review')),
+            ],
+        )
+        bitbucket_response = BitBucketResponseFactory.create(detail=[BitBucketIssueFactory.create(pullRequests=[])])
+        self._add_response(self.jira_sprint_api_url, jira_response)
+        self._add_response(self.jira_dev_tools_api_url, bitbucket_response)
+
+        self.loop.run_until_complete(self.bridge.run())
+        self.loop.run_until_complete(Bridge(self.sprint, channel_id='channel2').run())
+
+        self.assertEqual(self.m_get.call_count, 2)
+        self.assertEqual(self.chat_postMessage.await_count, 2)
+        self.assertFalse(self.fake_redis.exists(f'sprint-report:{self.sprint}:lock'))
+
+    def test_run_teams_posts_reminders_of_every_team_to_its_channel(self):
+        """
+        Test a situation where two teams are configured, one by its sprint and the other by its board.
+
+        In this situation the active sprint of the board should be looked up and each team's report should be sent
+        to the team's channel.
+        """
+        board_sprint = 400
+        self._add_response(
+            'https://empsgourp.atlassian.net/rest/agile/1.0/board/12/sprint', {'values': [{'id': board_sprint}]},
+        )
+        board_sprint_api_url = f'https://empsgourp.atlassian.net/rest/agile/1.0/sprint/{board_sprint}/issue'
+        for url in (self.jira_sprint_api_url, board_sprint_api_url):
+            self._add_response(
+                url,
+                JiraResponseFactory.create(
+                    issues=[
+                        JiraIssueFactory.create(fields__status=StatusFactory.create(name='In Review')),
+                    ],
+                ),
+            )
+        self._add_response(
+            self.jira_dev_tools_api_url,
+            *BitBucketResponseFactory.create_batch(2, detail=[BitBucketIssueFactory.create(pullRequests=[])]),
+        )
+        teams = [{'channel_id': 'channel1', 'sprint': self.sprint}, {'channel_id': 'channel2', 'board': 12}]
+
+        self.loop.run_until_complete(Bridge.run_teams(teams))
+
+        self.assertEqual(
+            sorted(call[1]['channel'] for call in self.chat_postMessage.await_args_list),
+            ['channel1', 'channel2'],
+        )
+        self.assertTrue(self.fake_redis.exists(f'sprint-report:{self.sprint}'))
+        self.assertTrue(self.fake_redis.exists(f'sprint-report:{board_sprint}'))
+
+    def test_run_teams_posts_reminders_of_other_teams_when_one_fails(self):
+        """
+        Test a situation where the board of one of the teams doesn't have an active sprint.
+
+        In this situation the error should be logged and the other team's reminder should be sent.
+        """
+        self._add_response('https://empsgourp.atlassian.net/rest/agile/1.0/board/12/sprint', {'values': []})
+        self._add_response(
+            self.jira_sprint_api_url,
+            JiraResponseFactory.create(
+                issues=[
+                    JiraIssueFactory.create(fields__status=StatusFactory.create(name='In Review')),
+                ],
+            ),
+        )
+        self._add_response(
+            self.jira_dev_tools_api_url,
+            BitBucketResponseFactory.create(detail=[BitBucketIssueFactory.create(pullRequests=[])]),
+        )
+        teams = [{'channel_id': 'channel1', 'sprint': self.sprint}, {'channel_id': 'channel2', 'board': 12}]
+
+        with self.assertLogs('reporter', 'ERROR'):
+            self.loop.run_until_complete(Bridge.run_teams(teams))
+
+        expected_message = self._get_expected_no_pull_request_message()
+        self.chat_postMessage.assert_awaited_once_with(channel='channel1', **expected_message)
+
+    def test_serve_posts_a_fresh_report_without_asking_jira(self):
+        """
+        Test a situation where a report of the sprint was rendered recently.
+
+        In this situation the stored report should be posted as it is.
+        """
+        message = self._get_expected_no_pull_request_message()
+        self.fake_redis.set(
+            f'sprint-report:{self.sprint}', json.dumps({'rendered_at': time(), 'messages': [message]}),
+        )
+
+        self.loop.run_until_complete(Bridge(self.sprint, channel_id='channel').serve())
+
+        self.assertEqual(self.m_get.call_count, 0)
+        self.chat_postMessage.assert_awaited_once_with(channel='channel', **message)
+
+    def _set_stale_report(self, messages: list) -> None:
+        """Store a report of the sprint rendered half an hour ago."""
+        self.fake_redis.set(
+            f'sprint-report:{self.sprint}', json.dumps({'rendered_at': time() - 1800, 'messages': messages}),
+        )
+        jira_response = JiraResponseFactory.create(
+            issues=[
+                JiraIssueFactory.create(fields__status=StatusFactory.create(name='In Review')),
+            ],
+        )
+        bitbucket_response = BitBucketResponseFactory.create(detail=[BitBucketIssueFactory.create(pullRequests=[])])
+        self._add_response(self.jira_sprint_api_url, jira_response)
+        self._add_response(self.jira_dev_tools_api_url, bitbucket_response)
+
+    def test_serve_posts_a_stale_report_and_then_the_changed_one(self):
+        """
+        Test a situation where the stored report of the sprint is stale and the sprint changed since.
+
+        In this situation the stale report should be posted first with a notice of its age, then rendered again
+        and the new report posted too.
+        """
+        stale_message = {'blocks': [{'type': 'divider'}]}
+        self._set_stale_report([stale_message])
+
+        self.loop.run_until_complete(Bridge(self.sprint, channel_id='channel').serve())
+
+        notice, stale, refreshed = [call[1] for call in self.chat_postMessage.await_args_list]
+        self.assertIn('30 minutes ago', notice['blocks'][0]['elements'][0]['text'])
+        self.assertEqual(stale, {'channel': 'channel', **stale_message})
+        self.assertEqual(refreshed, {'channel': 'channel', **self._get_expected_no_pull_request_message()})
+        report = json.loads(self.fake_redis.get(f'sprint-report:{self.sprint}'))
+        self.assertEqual(report['messages'], [self._get_expected_no_pull_request_message()])
+        self.assertAlmostEqual(report['rendered_at'], time(), delta=5)
+
+    def test_serve_posts_a_stale_report_once_when_nothing_changed(self):
+        """
+        Test a situation where the stored report of the sprint is stale but the sprint didn't change since.
+
+        In this situation only the stale report with a notice of its age should be posted.
+        """
+        self._set_stale_report([self._get_expected_no_pull_request_message()])
+
+        self.loop.run_until_complete(Bridge(self.sprint, channel_id='channel').serve())
+
+        self.assertEqual(self.chat_postMessage.await_count, 2)
+        self.assertEqual(self.m_get.call_count, 2)
+
+    def test_serve_renders_a_report_older_than_max_age_before_posting_it(self):
+        """
+        Test a situation where the stored report of the sprint is older than the report's max age.
+
+        In this situation only the newly rendered report should be posted.
+        """
+        self._set_stale_report([{'blocks': [{'type': 'divider'}]}])
+
+        with patch.object(Bridge, 'report_max_age', 60):
+            self.loop.run_until_complete(Bridge(self.sprint, channel_id='channel').serve())
+
+        self.chat_postMessage.assert_awaited_once_with(channel='channel', **self._get_expected_no_pull_request_message())
+
+    def test_post_mentions_reviewers_found_in_the_members_index(self):
+        """
+        Test a situation where reviewers of a pull request are members of the slack workspace.
+
+        In this situation reviewers should be mentioned by their slack ids, also when their name in Jira
+        contains non ascii letters and the slack name doesn't.
+        """
+        jira_response = JiraResponseFactory.create(
+            issues=[
+                JiraIssueFactory.create(fields__status=StatusFactory.create(name='In Review')),
+            ],
+        )
+        reviewers = [
+            ReviewerFactory.create(name='Mary Mary1', approved=False),
+            ReviewerFactory.create(name='Jéff Jeff', approved=False),
+            ReviewerFactory.create(name='Unknown', approved=False),
+        ]
+        bitbucket_response = BitBucketResponseFactory.create(
+            detail=[
+                BitBucketIssueFactory.create(
+                    pullRequests=[PullRequestFactory.create(status='OPEN', reviewers=reviewers)],
+                ),
+            ],
+        )
+        self._add_response(self.jira_sprint_api_url, jira_response)
+        self._add_response(self.jira_dev_tools_api_url, bitbucket_response)
+        self.fake_redis.hset('slack-members-index', mapping={'Mary Mary1': '1', 'Jeff Jeff': '5'})
+
+        self.loop.run_until_complete(self.bridge.run())
+
+        message = self.chat_postMessage.await_args.kwargs
+        self.assertEqual(message['blocks'][4]['text']['text'], '<@1> <@5> Unknown')
+
+    def test_post_syncs_members_before_mentioning_reviewers_when_the_index_is_missing(self):
+        """
+        Test a situation where the members index doesn't exist yet, e.g. right after a deploy.
+
+        In this situation the workspace members should be synced first, so reviewers are mentioned by their slack ids.
+        """
+        jira_response = JiraResponseFactory.create(
+            issues=[
+                JiraIssueFactory.create(fields__status=StatusFactory.create(name='In Review')),
+            ],
+        )
+        reviewers = [ReviewerFactory.create(name='Mary Mary1', approved=False)]
+        bitbucket_response = BitBucketResponseFactory.create(
+            detail=[
+                BitBucketIssueFactory.create(
+                    pullRequests=[PullRequestFactory.create(status='OPEN', reviewers=reviewers)],
+                ),
+            ],
+        )
+        self._add_response(self.jira_sprint_api_url, jira_response)
+        self._add_response(self.jira_dev_tools_api_url, bitbucket_response)
+        AsyncWebClient.users_list.return_value = {
+            'ok': True,
+            'members': [{'id': '1', 'profile': {'real_name_normalized': 'Mary Mary1'}}],
+        }
+
+        self.loop.run_until_complete(self.bridge.run())
+
+        AsyncWebClient.users_list.assert_awaited_once()
+        message = self.chat_postMessage.await_args.kwargs
+        self.assertEqual(message['blocks'][4]['text']['text'], '<@1>')
+        self.assertEqual(json.loads(self.fake_redis.get('slack-known-user-ids')), {'Mary Mary1': '<@1>'})
+
+    def test_post_resolves_all_reviewers_in_one_batch(self):
+        """
+        Test a situation where many issues share reviewers.
+
+        In this situation unique reviewers of all issues should be looked up in the members index at once.
+        """
+        jira_response = JiraResponseFactory.create(
+            issues=JiraIssueFactory.create_batch(size=2, fields__status=StatusFactory.create(name='In Review')),
+        )
+        reviewers = ReviewerFactory.create_batch(3, approved=False)
+        bitbucket_issues = BitBucketIssueFactory.create_batch(
+            size=2,
+            pullRequests=[PullRequestFactory.create(status='OPEN', reviewers=reviewers)],
+        )
+        bitbucket_responses = BitBucketResponseFactory.create_batch(
+            size=2,
+            detail=Iterator([
+                [bitbucket_issues[0]],
+                [bitbucket_issues[1]],
+            ]),
+        )
+        self._add_response(self.jira_sprint_api_url, jira_response)
+        self._add_response(self.jira_dev_tools_api_url, *bitbucket_responses)
+        m_hmget = patch.object(self.fake_redis, 'hmget', wraps=self.fake_redis.hmget).start()
+
+        self.loop.run_until_complete(self.bridge.run())
+
+        m_hmget.assert_called_once()
+        self.assertEqual(len(m_hmget.call_args.args[1]), 2 * len(reviewers))
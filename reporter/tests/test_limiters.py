@@ -0,0 +1,176 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import time
+
+from asynctest import TestCase
+
+from ..exceptions import CircuitOpenException
+from ..limiters import (
+    AdaptiveTimeout,
+    CircuitBreaker,
+    ConcurrencyLimiter,
+    TokenBucket,
+    get_backoff,
+    get_retry_after,
+)
+
+
+class TokenBucketTestCase(TestCase):
+    """TestCase for TokenBucket."""
+
+    async def test_acquire_does_not_wait_within_capacity(self):
+        """Test if tokens within the bucket's capacity are handed out immediately."""
+        bucket = TokenBucket(rate=1, capacity=3)
+        start = time.monotonic()
+
+        for _ in range(3):
+            await bucket.acquire()
+
+        self.assertLess(time.monotonic() - start, 0.1)
+
+    async def test_acquire_waits_when_paused(self):
+        """Test if a paused bucket doesn't hand out tokens until the pause is over."""
+        bucket = TokenBucket(rate=100)
+        bucket.pause(0.2)
+        start = time.monotonic()
+
+        await bucket.acquire()
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+
+
+class ConcurrencyLimiterTestCase(TestCase):
+    """TestCase for ConcurrencyLimiter."""
+
+    async def test_limiter_lets_in_limited_number_of_coroutines(self):
+        """Test if no more than the limit of coroutines ran at once."""
+        limiter = ConcurrencyLimiter(2)
+        running = {'now': 0, 'max': 0}
+
+        async def run():
+            async with limiter:
+                running['now'] += 1
+                running['max'] = max(running['max'], running['now'])
+                await asyncio.sleep(0.01)
+                running['now'] -= 1
+
+        await asyncio.gather(*(run() for _ in range(5)))
+
+        self.assertEqual(running['max'], 2)
+
+    def test_limiter_can_be_shared_by_event_loops(self):
+        """Test if a limiter created outside of a loop worked in different loops."""
+        limiter = ConcurrencyLimiter(1)
+
+        async def run():
+            async with limiter:
+                return True
+
+        for _ in range(2):
+            loop = asyncio.new_event_loop()
+            self.assertTrue(loop.run_until_complete(run()))
+            loop.close()
+
+
+class GetRetryAfterTestCase(TestCase):
+    """TestCase for get_retry_after function."""
+
+    def test_get_retry_after_parses_seconds(self):
+        """Test if a number of seconds is returned as is."""
+        self.assertEqual(get_retry_after('7', default=1), 7)
+
+    def test_get_retry_after_parses_http_date(self):
+        """Test if an HTTP date is converted to a number of seconds from now."""
+        value = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+
+        self.assertAlmostEqual(get_retry_after(value, default=1), 30, delta=2)
+
+    def test_get_retry_after_returns_default_when_header_is_missing_or_invalid(self):
+        """Test if the default is returned when the header can't be used."""
+        self.assertEqual(get_retry_after(None, default=4), 4)
+        self.assertEqual(get_retry_after('soon', default=4), 4)
+
+
+class AdaptiveTimeoutTestCase(TestCase):
+    """TestCase for AdaptiveTimeout."""
+
+    def test_timeout_follows_recorded_latency(self):
+        """Test if the timeout drops to fit a fast API and stays within its bounds."""
+        timeout = AdaptiveTimeout(initial=10, minimum=0.5, maximum=30)
+
+        for _ in range(20):
+            timeout.record(0.2)
+
+        self.assertAlmostEqual(timeout.value, 0.5, delta=0.1)
+
+    def test_timeout_grows_with_latency_variance(self):
+        """Test if the timeout leaves room for latency that varies."""
+        timeout = AdaptiveTimeout(initial=10, minimum=0.1, maximum=30)
+
+        for latency in (0.2, 2.0) * 10:
+            timeout.record(latency)
+
+        self.assertGreater(timeout.value, 2.0)
+
+    def test_record_timeout_doubles_timeout_up_to_maximum(self):
+        """Test if a timed out request doubles the timeout without exceeding the maximum."""
+        timeout = AdaptiveTimeout(initial=10, minimum=1, maximum=30)
+
+        timeout.record_timeout()
+        self.assertEqual(timeout.value, 20)
+        timeout.record_timeout()
+        self.assertEqual(timeout.value, 30)
+
+
+class CircuitBreakerTestCase(TestCase):
+    """TestCase for CircuitBreaker."""
+
+    def test_circuit_opens_after_failures_in_a_row(self):
+        """Test if the circuit opens only after the threshold of failures in a row."""
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.check()
+        breaker.record_failure()
+
+        with self.assertRaises(CircuitOpenException):
+            breaker.check()
+
+    def test_circuit_lets_requests_through_after_reset_timeout(self):
+        """Test if requests are let through after the reset timeout and a failure opens the circuit again."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        self.assertTrue(breaker.is_open)
+
+        time.sleep(0.06)
+        breaker.check()
+        breaker.record_failure()
+
+        self.assertTrue(breaker.is_open)
+
+    def test_success_closes_circuit(self):
+        """Test if a successful request closes the circuit."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+
+        breaker.record_success()
+
+        self.assertFalse(breaker.is_open)
+        self.assertEqual(breaker.failures, 0)
+
+
+class GetBackoffTestCase(TestCase):
+    """TestCase for get_backoff function."""
+
+    def test_get_backoff_is_bounded_by_exponential_delay_and_maximum(self):
+        """Test if delays are random values within the exponential bound and the maximum."""
+        for attempt, bound in ((0, 0.5), (2, 2.0), (10, 5.0)):
+            delays = [get_backoff(attempt, base=0.5, maximum=5) for _ in range(100)]
+            with self.subTest(attempt=attempt):
+                self.assertTrue(all(0 <= delay <= bound for delay in delays))
+                self.assertGreater(len(set(delays)), 1)
@@ -0,0 +1,103 @@
+from unittest import TestCase
+
+from asynctest import CoroutineMock, MagicMock, TestCase as AsyncTestCase, call
+from slack_sdk.errors import SlackApiError
+
+from ..messages import ChannelSender, MessagePacker
+
+
+def issue_blocks(key: str, size: int) -> list:
+    """Return blocks of an issue with a given number of pull requests."""
+    return [{'title': key}] + [{'pr': f'{key}-{i}'} for i in range(size)] + [{'type': 'divider'}]
+
+
+class MessagePackerTestCase(TestCase):
+    """TestCase for MessagePacker."""
+
+    def setUp(self):
+        """Set up the test fixture before exercising it."""
+        self.packer = MessagePacker(lambda: [{'type': 'header'}], max_blocks=10, max_size=10000)
+
+    def test_pack_keeps_issues_together(self):
+        """Test if an issue that doesn't fit into a message is moved to the next one."""
+        messages = list(self.packer.pack([issue_blocks('A', 4), issue_blocks('B', 4)]))
+
+        self.assertEqual([len(message['blocks']) for message in messages], [7, 7])
+        self.assertEqual(messages[1]['blocks'][1], {'title': 'B'})
+
+    def test_pack_sends_the_last_partial_message(self):
+        """Test if the last message is yielded after a full one was flushed."""
+        messages = list(self.packer.pack([issue_blocks('A', 7), issue_blocks('B', 1)]))
+
+        self.assertEqual(len(messages), 2)
+        self.assertEqual(messages[1]['blocks'][1:], issue_blocks('B', 1))
+
+    def test_pack_splits_an_issue_that_does_not_fit_into_an_empty_message(self):
+        """Test if a big issue is split into parts that repeat its title."""
+        messages = list(self.packer.pack([issue_blocks('A', 12)]))
+
+        self.assertTrue(all(len(message['blocks']) <= 10 for message in messages))
+        self.assertEqual([message['blocks'][1] for message in messages], [{'title': 'A'}] * len(messages))
+        self.assertEqual(
+            [block for message in messages for block in message['blocks'] if 'pr' in block],
+            issue_blocks('A', 12)[1:-1],
+        )
+
+    def test_pack_respects_the_payload_size(self):
+        """Test if a message is flushed when its payload would be too large."""
+        packer = MessagePacker(lambda: [], max_blocks=50, max_size=100)
+
+        messages = list(packer.pack([[{'text': 'x' * 60}], [{'text': 'y' * 60}]]))
+
+        self.assertEqual(len(messages), 2)
+
+    def test_pack_yields_a_message_when_there_are_no_issues(self):
+        """Test if a message with the starting blocks is yielded when there are no issues."""
+        messages = list(self.packer.pack([]))
+
+        self.assertEqual(messages, [{'blocks': [{'type': 'header'}]}])
+
+
+class ChannelSenderTestCase(AsyncTestCase):
+    """TestCase for ChannelSender."""
+
+    def setUp(self):
+        """Set up the test fixture before exercising it."""
+        self.client = MagicMock()
+        self.client.chat_postMessage = CoroutineMock()
+        self.sender = ChannelSender(self.client, 'channelId123')
+
+    async def test_sender_sends_queued_messages_in_order(self):
+        """Test if queued messages are sent in the order they were queued."""
+        messages = [{'blocks': [{'id': i}]} for i in range(3)]
+
+        self.sender.start()
+        for message in messages:
+            await self.sender.put(message)
+        await self.sender.close()
+
+        self.assertEqual(
+            self.client.chat_postMessage.await_args_list,
+            [call(channel='channelId123', **message) for message in messages],
+        )
+
+    async def test_send_retries_rate_limited_messages(self):
+        """Test if a message rejected with a ratelimited error is sent again."""
+        response = MagicMock(headers={'Retry-After': '0'})
+        response.get.return_value = 'ratelimited'
+        self.client.chat_postMessage.side_effect = [SlackApiError('ratelimited', response), None]
+
+        with self.assertLogs('reporter', 'WARNING'):
+            await self.sender.send({'blocks': []})
+
+        self.assertEqual(self.client.chat_postMessage.await_count, 2)
+
+    async def test_send_raises_other_errors(self):
+        """Test if an error other than ratelimited is raised without retrying."""
+        response = MagicMock(headers={})
+        response.get.return_value = 'channel_not_found'
+        self.client.chat_postMessage.side_effect = SlackApiError('channel_not_found', response)
+
+        with self.assertRaises(SlackApiError):
+            await self.sender.send({'blocks': []})
+        self.client.chat_postMessage.assert_awaited_once()
@@ -0,0 +1,21 @@
+from unittest import TestCase
+
+from ..parsers import JiraParser
+
+
+class TestJiraParser(TestCase):
+    """TestCase for JiraParser."""
+
+    def test_has_open_pull_requests_reads_state_of_development_summary(self):
+        """Test if only a summary of open pull requests is recognized as one with open pull requests."""
+        cases = (
+            (None, False),
+            ('{}', False),
+            ('{repository={count=2, dataType=repository}, json={}}', False),
+            ('{pullrequest={dataType=pullrequest, state=MERGED, stateCount=2}, json={}}', False),
+            ('{pullrequest={dataType=pullrequest, state=OPEN, stateCount=1}, json={}}', True),
+            ('{json={"cachedValue":{"summary":{"pullrequest":{"overall":{"count":1}}}}}}', True),
+        )
+        for development, expected in cases:
+            with self.subTest(development=development):
+                self.assertEqual(JiraParser.has_open_pull_requests(development), expected)
@@ -0,0 +1,26 @@
+from asynctest import TestCase
+
+from ..sessions import close_session, get_session
+
+
+class SessionTestCase(TestCase):
+    """TestCase for the process-wide HTTP session."""
+
+    def tearDown(self):
+        """Deconstruct the test fixture after testing it."""
+        self.loop.run_until_complete(close_session())
+
+    async def test_get_session_reuses_the_session(self):
+        """Test if the same session is returned within an event loop."""
+        session = await get_session()
+
+        self.assertIs(await get_session(), session)
+
+    async def test_get_session_creates_a_new_session_after_closing(self):
+        """Test if a new session is created when the previous one was closed."""
+        session = await get_session()
+
+        await close_session()
+
+        self.assertTrue(session.closed)
+        self.assertIsNot(await get_session(), session)
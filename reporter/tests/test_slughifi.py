@@ -1,6 +1,6 @@
 from unittest import TestCase
 
-from ..slughify import slughifi
+from ..slughify import slughifi, slughifi_many
 
 
 class SlughifiTestCase(TestCase):
@@ -22,3 +22,20 @@ class SlughifiTestCase(TestCase):
         result = slughifi(name)
 
         self.assertEqual(result.decode(), name)
+
+    def test_slughifi_expands_chars_to_many_letters(self):
+        """Test if chars mapped to many letters were expanded and unknown non ascii chars dropped."""
+        name = 'Jürgen Щукин 中'
+        expected_result = 'Juergen SHCHUKIN '
+
+        result = slughifi(name)
+
+        self.assertEqual(result.decode(), expected_result)
+
+    def test_slughifi_many_returns_results_in_order(self):
+        """Test if many names were slugified in the same order."""
+        names = ['ąę', 'Łódź', 'plain']
+
+        result = slughifi_many(names)
+
+        self.assertEqual(result, [b'ae', b'Lodz', b'plain'])
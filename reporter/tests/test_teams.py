@@ -0,0 +1,58 @@
+import json
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+
+from fakeredis import FakeRedis
+
+from ..teams import get_teams, set_teams
+
+
+class TeamsTestCase(TestCase):
+    """TestCase for the teams configuration."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up class fixture before running tests in the class."""
+        cls.fake_redis = FakeRedis()
+
+    def setUp(self):
+        """Set up the test fixture before exercising it."""
+        self.addCleanup(patch.stopall)
+        patch('reporter.utils.get_redis_instance', return_value=self.fake_redis).start()
+
+    def tearDown(self):
+        """Deconstruct the test fixture after testing it."""
+        self.fake_redis.flushall()
+
+    def test_get_teams_returns_empty_list_when_teams_are_not_configured(self):
+        """Test if no teams are returned when they aren't configured."""
+        self.assertEqual(get_teams(), [])
+
+    def test_get_teams_returns_teams_stored_in_redis(self):
+        """Test if teams stored with set_teams are returned."""
+        teams = [{'channel_id': 'C1', 'sprint': 412}, {'channel_id': 'C2', 'board': 12}]
+
+        set_teams(teams)
+
+        self.assertEqual(get_teams(), teams)
+
+    def test_get_teams_loads_teams_from_config_file(self):
+        """Test if teams are loaded from the config file when they aren't stored in Redis."""
+        teams = [{'channel_id': 'C1', 'board': 12}]
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'teams.json')
+            with open(path, 'w') as config:
+                json.dump(teams, config)
+
+            with patch('reporter.teams.TEAMS_CONFIG_PATH', path):
+                self.assertEqual(get_teams(), teams)
+
+    def test_set_teams_raises_when_team_is_not_valid(self):
+        """Test if a team without a channel or without a sprint and a board is rejected."""
+        for team in ({'sprint': 412}, {'channel_id': 'C1'}):
+            with self.subTest(team=team), self.assertRaises(ValueError):
+                set_teams([team])
+
+        self.assertFalse(self.fake_redis.exists('teams'))
@@ -0,0 +1,99 @@
+import asyncio
+from unittest import TestCase
+from unittest.mock import patch
+
+import asynctest
+from fakeredis import FakeRedis
+
+from ..utils import (
+    get_value_from_redis,
+    redis_pipeline,
+    set_key_in_redis,
+    single_flight,
+)
+
+
+class RedisUtilsTestCase(TestCase):
+    """TestCase for Redis helpers."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up class fixture before running tests in the class."""
+        cls.fake_redis = FakeRedis()
+
+    def setUp(self):
+        """Set up the test fixture before exercising it."""
+        self.addCleanup(patch.stopall)
+        patch('reporter.utils.get_redis_instance', return_value=self.fake_redis).start()
+
+    def tearDown(self):
+        """Deconstruct the test fixture after testing it."""
+        self.fake_redis.flushall()
+
+    def test_get_value_from_redis_returns_none_when_key_does_not_exist(self):
+        """Test if None is returned for a missing key."""
+        self.assertIsNone(get_value_from_redis('missing'))
+
+    def test_get_value_from_redis_returns_decoded_value(self):
+        """Test if a stored value is decoded from json."""
+        set_key_in_redis('key', {'a': [1, 2]})
+
+        self.assertEqual(get_value_from_redis('key'), {'a': [1, 2]})
+
+    def test_redis_pipeline_executes_queued_commands_on_exit(self):
+        """Test if commands queued on the pipeline are executed when the context exits."""
+        with redis_pipeline() as pipe:
+            pipe.set('key', '1')
+            self.assertFalse(self.fake_redis.exists('key'))
+
+        self.assertEqual(self.fake_redis.get('key'), b'1')
+
+
+class SingleFlightTestCase(asynctest.TestCase):
+    """TestCase for sharing a call between concurrent callers."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up class fixture before running tests in the class."""
+        cls.fake_redis = FakeRedis()
+
+    def setUp(self):
+        """Set up the test fixture before exercising it."""
+        self.addCleanup(patch.stopall)
+        patch('reporter.utils.get_redis_instance', return_value=self.fake_redis).start()
+
+    def tearDown(self):
+        """Deconstruct the test fixture after testing it."""
+        self.fake_redis.flushall()
+
+    async def test_concurrent_callers_share_one_call(self):
+        """Test if the function is called once and every caller gets its result."""
+        async def function():
+            await asyncio.sleep(0.05)
+            return ['message']
+        function = asynctest.CoroutineMock(side_effect=function)
+
+        results = await asyncio.gather(*[
+            single_flight('key', function, lock_timeout=10, result_ttl=10, poll_interval=0.01) for _ in range(3)
+        ])
+
+        self.assertEqual(results, [['message']] * 3)
+        function.assert_awaited_once()
+        self.assertFalse(self.fake_redis.exists('key:lock'))
+        self.assertTrue(0 < self.fake_redis.ttl('key:result') <= 10)
+
+    async def test_caller_takes_over_when_the_call_failed(self):
+        """Test if a waiting caller calls the function itself when the first call failed."""
+        async def failing():
+            await asyncio.sleep(0.05)
+            raise ValueError('error')
+
+        first = asyncio.ensure_future(single_flight('key', failing, lock_timeout=10, result_ttl=10))
+        await asyncio.sleep(0)
+        second = single_flight(
+            'key', asynctest.CoroutineMock(return_value={'a': 1}), lock_timeout=10, result_ttl=10, poll_interval=0.01,
+        )
+
+        self.assertEqual(await second, {'a': 1})
+        with self.assertRaises(ValueError):
+            await first
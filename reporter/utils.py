@@ -1,5 +1,10 @@
+import asyncio
+from contextlib import contextmanager
 import json
-from typing import Union
+from typing import Awaitable, Callable, Iterator, List, Optional, Union
+from uuid import uuid4
+
+from redis.client import Pipeline
 
 from server.utils import get_redis_instance
 
@@ -9,14 +14,94 @@ def get_value_from_redis(key: str) -> Union[None, str, list, dict]:
 
     :param key: the key to look for in Redis.
     """
-    value = None
     with get_redis_instance() as redis:
-        if redis.exists(key):
-            value = json.loads(redis.get(key).decode())
-    return value
+        value = redis.get(key)
+    return json.loads(value.decode()) if value is not None else None
+
+
+def set_key_in_redis(key: str, value: Union[list, dict], expire: int = None) -> None:
+    """Set a value under a key in Redis.
+
+    :param key: the key to set in Redis.
+    :param value: the value to store under the key.
+    :param expire: after how many seconds the key should expire.
+    """
+    with get_redis_instance() as redis:
+        redis.set(key, json.dumps(value), ex=expire)
+
+
+def key_exists_in_redis(key: str) -> bool:
+    """Return whether a key exists in Redis.
+
+    :param key: the key to look for in Redis.
+    """
+    with get_redis_instance() as redis:
+        return bool(redis.exists(key))
+
+
+@contextmanager
+def redis_pipeline(transaction: bool = True) -> Iterator[Pipeline]:
+    """Return a Redis pipeline that is executed when the context exits.
+
+    Commands queued on the pipeline are sent to Redis in a single round trip.
+
+    :param transaction: whether the commands should be wrapped in MULTI/EXEC.
+    """
+    with get_redis_instance() as redis:
+        with redis.pipeline(transaction=transaction) as pipe:
+            yield pipe
+            pipe.execute()
+
 
+def get_hash_values_from_redis(key: str, fields: list) -> List[Optional[str]]:
+    """Get values of the given fields from a hash in Redis in a single round trip.
 
-def set_key_in_redis(key: str, value: Union[list, dict]) -> None:
-    """Set a value under a key in Redis."""
+    :param key: the hash's key in Redis.
+    :param fields: the fields to look for, a missing field is returned as None.
+    """
+    if not fields:
+        return []
     with get_redis_instance() as redis:
-        redis.set(key, json.dumps(value))
+        values = redis.hmget(key, fields)
+    return [value.decode() if value is not None else None for value in values]
+
+
+async def single_flight(
+    key: str,
+    function: Callable[[], Awaitable[Union[list, dict]]],
+    lock_timeout: int,
+    result_ttl: int,
+    poll_interval: float = 0.2,
+) -> Union[list, dict]:
+    """Share one call of a coroutine function between concurrent callers, also across processes.
+
+    The first caller takes a lock in Redis, awaits the function and stores its result for a short time. Other callers
+    wait for the result instead of calling the function themselves. A caller takes over when the lock is released or
+    expires without a result, e.g. when the function failed.
+
+    :param key: the key of the call, the lock and the result are stored under keys derived from it.
+    :param function: a coroutine function returning a JSON serializable value.
+    :param lock_timeout: after how many seconds the lock expires if it wasn't released.
+    :param result_ttl: after how many seconds the stored result expires.
+    :param poll_interval: how many seconds to wait between checks for the result.
+    """
+    lock_key, result_key = f'{key}:lock', f'{key}:result'
+    token = uuid4().hex
+    while True:
+        result = get_value_from_redis(result_key)
+        if result is not None:
+            return result
+        with get_redis_instance() as redis:
+            acquired = redis.set(lock_key, token, nx=True, ex=lock_timeout)
+        if acquired:
+            break
+        await asyncio.sleep(poll_interval)
+
+    try:
+        result = await function()
+        set_key_in_redis(result_key, result, expire=result_ttl)
+        return result
+    finally:
+        with get_redis_instance() as redis:
+            if redis.get(lock_key) == token.encode():
+                redis.delete(lock_key)
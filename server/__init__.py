@@ -14,6 +14,23 @@ for handling requests send to the Tornado server and should be assigned to a giv
     :members:
     :show-inheritance:
 
+jobs
+----
+
+This module contains the coroutines run by Celery tasks and by the in-process scheduler.
+
+.. automodule:: server.jobs
+    :members:
+
+scheduler
+---------
+
+This module contains an in-process job runner and scheduler. Run the app with ``--in_process_jobs`` to execute the
+Celery beat schedule and the message handling in the Tornado event loop, without a Celery worker or a broker.
+
+.. automodule:: server.scheduler
+    :members:
+
 tasks
 -----
 
@@ -25,4 +42,6 @@ This module contains tasks that can be executed via Celery.
 
 .. autofunction:: server.tasks.handle_message
 
+.. autofunction:: server.tasks.update_workspace_users
+
 """
@@ -1,10 +1,16 @@
 from tornado.web import Application
 
+from ..utils import EventDeduplicator
 from .settings import settings
 
 
 class MyApplication(Application):
     """A Tornado application."""
 
-    def __init__(self, urls):
+    def __init__(self, urls, job_runner=None):
         super().__init__(urls, **settings)
+        self.job_runner = job_runner
+        self.events = EventDeduplicator()
+        self.ready = True
+        # Counted by the handlers, see `server.handlers.BaseHandler`.
+        self.active_requests = 0
@@ -3,7 +3,7 @@ import os
 from celery.schedules import crontab
 
 
-broker_url = os.environ['BROKER_URL']
+broker_url = os.environ.get('BROKER_URL')
 
 # List of modules to import when the Celery worker starts.
 imports = ('server.tasks',)
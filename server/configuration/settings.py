@@ -5,11 +5,19 @@ from tornado.options import define
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 define('port', default=8000, type=int)
+define('in_process_jobs', default=False, type=bool, help='run scheduled tasks in the app instead of Celery')
+define('processes', default=1, type=int, help='number of processes sharing the socket, 0 forks one per CPU')
+
+# The production profile turns the debug mode off unless DEBUG says otherwise.
+ENVIRONMENT = os.environ.get('ENVIRONMENT', 'development')
+DEBUG = os.environ.get('DEBUG', str(ENVIRONMENT != 'production')).lower() in ('1', 'true', 'yes')
+# For how many seconds a stopping server waits for requests and jobs in progress.
+SHUTDOWN_TIMEOUT = float(os.environ.get('SHUTDOWN_TIMEOUT', 10))
 
 settings = {
     'static_path': '',
     'template_path': '',
-    'debug': True,
+    'debug': DEBUG,
     'cookie_secret': str(os.urandom(45)),
     'xsrf_cookies': False,  # umożliwia wykonywanie POST na formularzach
     'gzip': True,  # umożliwia przesyłanie skomprezowanych wartości
@@ -18,8 +26,15 @@ settings = {
 secure_pages = []
 
 SIGNING_SECRET = os.environ['SLACK_SIGNING_SECRET']
+# Acknowledge Slack events in the worker instead of the request handler.
+FAST_ACK = os.environ.get('SLACK_FAST_ACK', '').lower() in ('1', 'true', 'yes')
+# For how long and how many ids of handled Slack events are remembered.
+EVENT_TTL = int(os.environ.get('SLACK_EVENT_TTL', 60 * 60))
+EVENT_CACHE_SIZE = int(os.environ.get('SLACK_EVENT_CACHE_SIZE', 1024))
 
 REDIS_SOCKET_PATH = os.environ.get('REDIS_SOCKET_PATH', None)
 REDIS_PASSWORD = os.environ.get('REDIS_PASSWORD', None)
 REDIS_DATABASE = os.environ.get('REDIS_DATABASE', 0)
 REDIS_HOST = os.environ.get('REDIS_HOST', 'localhost')
+
+JOB_CONCURRENCY = int(os.environ.get('JOB_CONCURRENCY', 4))
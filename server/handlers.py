@@ -3,17 +3,49 @@ import hmac
 from time import time
 from typing import Awaitable, Optional
 
+from redis import RedisError
 from tornado.escape import json_decode
 from tornado.web import HTTPError, RequestHandler, access_log
 
 from reporter.apps import SlackApp
-from server.configuration.settings import SIGNING_SECRET
+from server.configuration.settings import FAST_ACK, SIGNING_SECRET
 
+from . import jobs
 from .tasks import handle_message
 from .utils import get_redis_instance
 
 
-class HomeHandler(RequestHandler):
+class BaseHandler(RequestHandler):
+    """
+    A handler whose requests are counted while they are in progress, so a stopping server waits for them.
+
+    A request is counted once it is prepared and stops being counted when it is finished or its client disconnected.
+    """
+
+    _counted = False
+
+    def prepare(self) -> Optional[Awaitable[None]]:
+        """Count the request in progress."""
+        self._counted = True
+        self.application.active_requests += 1
+        return None
+
+    def on_finish(self) -> None:
+        """Execute after the response was sent."""
+        self._uncount()
+
+    def on_connection_close(self) -> None:
+        """Execute when the client closed the connection."""
+        super().on_connection_close()
+        self._uncount()
+
+    def _uncount(self) -> None:
+        if self._counted:
+            self._counted = False
+            self.application.active_requests -= 1
+
+
+class HomeHandler(BaseHandler):
     """Home page handler."""
 
     def get(self) -> None:
@@ -21,13 +53,36 @@ class HomeHandler(RequestHandler):
         self.write('Hello world!')
 
 
-class SlackHandler(RequestHandler):
+class ReadinessHandler(BaseHandler):
+    """Readiness probe handler, the app is ready when it isn't shutting down and Redis is reachable."""
+
+    def get(self) -> None:
+        """HTTP get."""
+        if not self.application.ready:
+            self.set_status(503)
+            self.write({'status': 'shutting down'})
+            return
+        try:
+            with get_redis_instance() as redis:
+                redis.ping()
+        except RedisError as ex:
+            access_log.error(f'Redis is unavailable: {ex}')
+            self.set_status(503)
+            self.write({'status': 'redis unavailable'})
+            return
+        self.write({'status': 'ready'})
+
+
+class SlackHandler(BaseHandler):
     """Main handler for the server."""
 
     signing_secret = SIGNING_SECRET
+    fast_ack = FAST_ACK
+    member_events = ('team_join', 'user_change')
 
     def prepare(self) -> Optional[Awaitable[None]]:
         """Execute at the beginning of a request before  `get`/`post`/etc."""
+        super().prepare()
         request_timestamp = self.request.headers.get('X-Slack-Request-Timestamp')
         if not request_timestamp:
             access_log.error("Request doesn't have X-Slack-Request-Timestamp")
@@ -69,20 +124,53 @@ class SlackHandler(RequestHandler):
         return hmac.compare_digest(request_hash, signature)
 
     async def post(self) -> None:
-        """Handle the HTTP POST method."""
+        """
+        Handle the HTTP POST method.
+
+        In the fast-ack mode a message is only scheduled and the worker posts the acknowledgement, so the response
+        is returned without waiting for Slack.
+        """
         body = json_decode(self.request.body)
         access_log.debug(body)
         if body.get('challenge'):
             self.write(body['challenge'])
             return
 
-        message = self._validate_message(body.get('event'))
-        if message:
-            channel = message['channel']
+        event_id = body.get('event_id')
+        if event_id and not self.application.events.is_new(event_id):
+            access_log.debug(f'Event {event_id} was already handled.')
+            return
+
+        try:
+            await self._handle_event(body.get('event'))
+        except Exception:
+            if event_id:
+                self.application.events.release(event_id)
+            raise
+
+    async def _handle_event(self, event: dict) -> None:
+        """
+        Handle an event of the Events API.
+
+        :param event: the event sent by slack
+        """
+        if event.get('type') in self.member_events:
+            access_log.debug(f'Updating member: {event["user"]["id"]}')
+            SlackApp.update_member(event['user'])
+            return
+
+        message = self._validate_message(event)
+        if not message:
+            return
+        if not self.fast_ack:
             slack_app = SlackApp()
-            await slack_app.client.chat_postMessage(channel=channel, text="I'll respond in a moment...")
-            access_log.debug(f'Scheduling task...')
-            handle_message.delay(message)
+            await slack_app.client.chat_postMessage(channel=message['channel'], text=jobs.ACKNOWLEDGEMENT)
+        access_log.debug('Scheduling task...')
+        args = (message, True) if self.fast_ack else (message,)
+        if self.application.job_runner:
+            self.application.job_runner.submit(jobs.handle_message, *args)
+        else:
+            handle_message.delay(*args)
 
     def _validate_message(self, message: dict) -> Optional[dict]:
         """
@@ -97,13 +185,10 @@ class SlackHandler(RequestHandler):
         if channel_type != 'im':
             access_log.debug(f"Channel isn't a direct message channel. Channel type: {channel_type}")
             return None
-        if self.request.headers.get('X-Slack-Retry-Num'):
-            access_log.error(f'Muting retires: {self.request.headers.get("X-Slack-Retry-Num")}')
-            return None
         return message
 
 
-class SprintChangeHandler(RequestHandler):
+class SprintChangeHandler(BaseHandler):
     """Class for handling sprint change slash command from slack API."""
 
     def data_received(self, chunk: bytes) -> Optional[Awaitable[None]]:
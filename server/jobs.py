@@ -0,0 +1,75 @@
+import logging
+import os
+from typing import Awaitable, Callable, Dict
+
+from reporter.apps import SlackApp
+from reporter.bridge import Bridge
+from reporter.teams import get_teams
+from server.configuration.settings import BASE_DIR
+
+from .utils import validate_text
+
+logger = logging.getLogger('server')
+
+ACKNOWLEDGEMENT = "I'll respond in a moment..."
+
+
+async def display_changelog() -> None:
+    """Display changes in a weekly message."""
+    path = os.path.dirname(BASE_DIR)
+    with open(os.path.join(path, 'CHANGELOG.rst')) as temp:
+        changelog = temp.read()
+
+    slack_app = SlackApp()
+    await slack_app.client.chat_postMessage(
+        channel=slack_app.channel_id,
+        text=changelog,
+    )
+
+
+async def display_pull_requests() -> None:
+    """Display pull requests as a newsletter, for every configured team if there are any."""
+    teams = get_teams()
+    if teams:
+        await Bridge.run_teams(teams)
+    else:
+        await Bridge().run()
+
+
+async def handle_message(message: dict, acknowledge: bool = False) -> None:
+    """
+    Handle a message that requires more then 3 seconds to execute.
+
+    :param message: a message dict from slack
+    :param acknowledge: whether to let the user know that the message is being handled first
+    """
+    logger.debug(f'handle_message job with message: {message}')
+    channel = message['channel']
+    if acknowledge:
+        await SlackApp().client.chat_postMessage(channel=channel, text=ACKNOWLEDGEMENT)
+    sprint_number = validate_text(message.get('text'))
+    if sprint_number:
+        logger.debug(f'running for sprint: {sprint_number}')
+        bridge = Bridge(sprint_number, channel_id=channel)
+        await bridge.serve()
+    else:
+        logger.debug('Sprint number not valid')
+        await SlackApp().client.chat_postMessage(
+            channel=channel,
+            text='Please write in the following syntax "sprint <int>"',
+        )
+
+
+async def update_workspace_users() -> None:
+    """Update slack's workspace users to Redis."""
+    synced = await SlackApp().sync_members()
+    logger.debug(f'synced {synced} workspace members')
+
+
+# Jobs by the name of the Celery task that runs them.
+JOBS: Dict[str, Callable[..., Awaitable[None]]] = {
+    'server.tasks.display_changelog': display_changelog,
+    'server.tasks.display_pull_requests': display_pull_requests,
+    'server.tasks.handle_message': handle_message,
+    'server.tasks.update_workspace_users': update_workspace_users,
+}
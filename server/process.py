@@ -0,0 +1,92 @@
+import os
+import random
+import signal
+import sys
+from typing import Dict, Optional
+
+from tornado.log import gen_log
+from tornado.process import cpu_count
+
+
+class Supervisor:
+    """
+    Fork processes that share the sockets bound before and supervise them.
+
+    Unlike Tornado's `fork_processes` the parent process handles signals: SIGTERM and SIGINT, e.g. from a container
+    runtime, are forwarded to the children as SIGTERM, so every child shuts down gracefully, and the parent exits
+    after all of them exited. A child that exited abnormally is started again unless the supervisor is stopping.
+    """
+
+    def __init__(self, num_processes: int, max_restarts: int = 100):
+        """
+        Initialize.
+
+        :param num_processes: the number of processes, 0 forks one per CPU
+        :param max_restarts: how many times children that exited abnormally may be started again
+        """
+        self.num_processes = num_processes if num_processes > 0 else cpu_count()
+        self.max_restarts = max_restarts
+        self.children: Dict[int, int] = {}
+        self.stopping = False
+        self.task_id: Optional[int] = None
+
+    def start(self) -> int:
+        """
+        Fork the processes and supervise them until all of them exited, then exit.
+
+        :returns: in a child, its task id, a number between 0 and `num_processes` - 1
+        """
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, self._stop_children)
+        gen_log.info('Starting %d processes', self.num_processes)
+        for task_id in range(self.num_processes):
+            if self._start_child(task_id):
+                return self.task_id
+
+        restarts = 0
+        while self.children:
+            pid, status = os.wait()
+            task_id = self.children.pop(pid, None)
+            if task_id is None or self._exited_normally(task_id, pid, status) or self.stopping:
+                continue
+            restarts += 1
+            if restarts > self.max_restarts:
+                raise RuntimeError('Too many child restarts, giving up')
+            if self._start_child(task_id):
+                return self.task_id
+        sys.exit(0)
+
+    def _start_child(self, task_id: int) -> bool:
+        """Fork a child and return whether the current process is the child."""
+        pid = os.fork()
+        if pid:
+            self.children[pid] = task_id
+            return False
+
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        # Children would share the parent's random state, e.g. the jitter of retries.
+        random.seed()
+        self.children = {}
+        self.task_id = task_id
+        return True
+
+    def _stop_children(self, signum: int, frame) -> None:
+        gen_log.info('Received signal %d, stopping %d processes', signum, len(self.children))
+        self.stopping = True
+        for pid in self.children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    @staticmethod
+    def _exited_normally(task_id: int, pid: int, status: int) -> bool:
+        if os.WIFSIGNALED(status):
+            gen_log.warning('child %d (pid %d) killed by signal %d', task_id, pid, os.WTERMSIG(status))
+            return False
+        if os.WEXITSTATUS(status) != 0:
+            gen_log.warning('child %d (pid %d) exited with status %d', task_id, pid, os.WEXITSTATUS(status))
+            return False
+        gen_log.info('child %d (pid %d) exited normally', task_id, pid)
+        return True
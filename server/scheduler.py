@@ -0,0 +1,109 @@
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable, Dict, Optional
+
+from celery.schedules import maybe_schedule
+
+from server.configuration.settings import JOB_CONCURRENCY
+
+from .celery import app
+from .jobs import JOBS
+
+logger = logging.getLogger('server')
+
+Job = Callable[..., Awaitable[None]]
+
+
+class JobRunner:
+    """
+    Run jobs as tasks in the current event loop.
+
+    At most `concurrency` jobs run at the same time and a job submitted with the same arguments as a job that is still
+    pending or running is skipped.
+    """
+
+    def __init__(self, concurrency: int = JOB_CONCURRENCY):
+        self.concurrency = concurrency
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def submit(self, job: Job, *args) -> asyncio.Task:
+        """
+        Schedule a job and return its task.
+
+        :param job: a coroutine function from `server.jobs`
+        :param args: positional arguments for the job, they have to be JSON serializable
+        """
+        key = f'{job.__name__}:{json.dumps(args, sort_keys=True)}'
+        if key in self.tasks:
+            logger.debug(f'Job {job.__name__} is already scheduled, skipping.')
+            return self.tasks[key]
+
+        task = asyncio.ensure_future(self._run(job, *args))
+        self.tasks[key] = task
+        task.add_done_callback(lambda _: self.tasks.pop(key, None))
+        return task
+
+    async def join(self) -> None:
+        """Wait until all scheduled jobs are finished."""
+        while self.tasks:
+            await asyncio.wait(list(self.tasks.values()))
+
+    async def _run(self, job: Job, *args) -> None:
+        """Run a job once a slot is free, logging instead of raising its errors."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._semaphore:
+            try:
+                await job(*args)
+            except Exception:
+                logger.exception(f'Job {job.__name__} failed')
+
+
+class Scheduler:
+    """Submit jobs to a runner according to the Celery beat schedule."""
+
+    max_interval = 300
+
+    def __init__(self, runner: JobRunner, beat_schedule: Optional[dict] = None):
+        self.runner = runner
+        if beat_schedule is None:
+            beat_schedule = app.conf.beat_schedule
+        self.entries = [
+            (JOBS[entry['task']], maybe_schedule(entry['schedule'], app=app), entry.get('args') or ())
+            for entry in beat_schedule.values()
+        ]
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start scheduling jobs in the current event loop."""
+        if self._task is None:
+            self._task = asyncio.ensure_future(self.run())
+
+    def stop(self) -> None:
+        """Stop scheduling jobs."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def run(self) -> None:
+        """Submit every job when it's due, sleeping until the closest one in between."""
+        last_run_at = [schedule.now() for _, schedule, _ in self.entries]
+        while True:
+            await asyncio.sleep(self.tick(last_run_at))
+
+    def tick(self, last_run_at: list) -> float:
+        """
+        Submit due jobs and return seconds until the next check.
+
+        :param last_run_at: datetimes of the last run of each entry, updated in place
+        """
+        interval = self.max_interval
+        for index, (job, schedule, args) in enumerate(self.entries):
+            is_due, next_run = schedule.is_due(last_run_at[index])
+            if is_due:
+                last_run_at[index] = schedule.now()
+                self.runner.submit(job, *args)
+            interval = min(interval, next_run)
+        return interval
@@ -1,74 +1,44 @@
-import asyncio
-import json
-import os
+from celery.signals import worker_process_shutdown, worker_shutdown
 
-from celery.utils.log import get_task_logger
-from slack_sdk import WebClient
-
-from reporter.apps import SlackApp
-from reporter.bridge import Bridge
-from reporter.conf import SLACK_TOKEN
-from server.configuration.settings import BASE_DIR
+from reporter.sessions import close_session
 
+from . import jobs
 from .celery import app
-from .utils import get_redis_instance, validate_text
+from .utils import run_coroutine, stop_event_loop
+
 
-logger = get_task_logger('server')
+@worker_shutdown.connect
+@worker_process_shutdown.connect
+def close_event_loop(**kwargs) -> None:
+    """Close the pooled HTTP connections and stop the event loop when a worker exits."""
+    run_coroutine(close_session())
+    stop_event_loop()
 
 
 @app.task
 def display_changelog() -> None:
     """Display changes in a weekly message."""
-    path = os.path.dirname(BASE_DIR)
-    with open(os.path.join(path, 'CHANGELOG.rst')) as temp:
-        changelog = temp.read()
-
-    loop = asyncio.get_event_loop()
-    slack_app = SlackApp()
-    loop.run_until_complete(
-        slack_app.client.chat_postMessage(
-            channel=slack_app.channel_id,
-            text=changelog,
-        ),
-    )
+    run_coroutine(jobs.display_changelog())
 
 
 @app.task
 def display_pull_requests() -> None:
     """Display pull requests as a newsletter."""
-    loop = asyncio.get_event_loop()
-    loop.run_until_complete(Bridge().run())
+    run_coroutine(jobs.display_pull_requests())
 
 
 @app.task
-def handle_message(message: dict) -> None:
+def handle_message(message: dict, acknowledge: bool = False) -> None:
     """
     Task for handling messages that require more then 3 seconds to execute.
 
     :param message: a message dict from slack
+    :param acknowledge: whether to let the user know that the message is being handled first
     """
-    logger.debug(f'handle_message task with message: {message}')
-    channel = message['channel']
-    loop = asyncio.get_event_loop()
-    sprint_number = validate_text(message.get('text'))
-    if sprint_number:
-        logger.debug(f'running for sprint: {sprint_number}')
-        bridge = Bridge(sprint_number, channel_id=channel)
-        loop.run_until_complete(bridge.run())
-    else:
-        logger.debug('Sprint number not valid')
-        loop.run_until_complete(
-            SlackApp().client.chat_postMessage(
-                channel=channel,
-                text='Please write in the following syntax "sprint <int>"',
-            ),
-        )
+    run_coroutine(jobs.handle_message(message, acknowledge))
 
 
 @app.task
 def update_workspace_users() -> None:
     """Update slack's workspace users to Redis."""
-    slack = WebClient(token=SLACK_TOKEN)
-    users = slack.users_list()
-    with get_redis_instance() as redis:
-        redis.set('slack-members', json.dumps(users['members']))
+    run_coroutine(jobs.update_workspace_users())
@@ -1,19 +1,30 @@
+import asyncio
 import hashlib
 import hmac
 import json
 from time import time
 from urllib.parse import urlencode
 
-from asynctest import CoroutineMock, patch
+from asynctest import CoroutineMock, Mock, patch
 from fakeredis import FakeRedis
+from redis import ConnectionError as RedisConnectionError
 from slack_sdk.web.async_client import AsyncWebClient
-from tornado.testing import AsyncHTTPTestCase
+from tornado.simple_httpclient import HTTPTimeoutError
+from tornado.testing import AsyncHTTPTestCase, ExpectLog
 from tornado.web import Application, url
 
 from server.configuration.application import MyApplication
 from server.configuration.settings import SIGNING_SECRET
 
-from ..handlers import HomeHandler, SlackHandler, SprintChangeHandler
+from .. import jobs
+from ..handlers import (
+    BaseHandler,
+    HomeHandler,
+    ReadinessHandler,
+    SlackHandler,
+    SprintChangeHandler,
+)
+from ..utils import EventDeduplicator
 
 
 class HomeHandlerTestCase(AsyncHTTPTestCase):
@@ -36,6 +47,89 @@ class HomeHandlerTestCase(AsyncHTTPTestCase):
         self.assertEqual(response.body.decode(), 'Hello world!')
 
 
+class BaseHandlerTestCase(AsyncHTTPTestCase):
+    """TestCase for counting requests in progress."""
+
+    def get_app(self) -> Application:
+        """Return a Tornado application."""
+        self.handled = asyncio.Event()
+        test_case = self
+
+        class SlowHandler(BaseHandler):
+            async def get(self) -> None:
+                await test_case.handled.wait()
+                self.write('done')
+
+        return MyApplication(
+            urls=[
+                url(r'/', HomeHandler),
+                url(r'/slow/', SlowHandler),
+            ],
+        )
+
+    def test_finished_request_is_not_counted(self):
+        """Test a request stops being counted when its response was sent."""
+        response = self.fetch('/')
+
+        self.assertEqual(response.code, 200)
+        self.assertEqual(self._app.active_requests, 0)
+
+    def test_request_of_a_disconnected_client_is_not_counted(self):
+        """Test a request stops being counted when its client disconnected before the response was sent."""
+        with self.assertRaises(HTTPTimeoutError):
+            self.fetch('/slow/', request_timeout=0.2)
+        self.io_loop.run_sync(lambda: asyncio.sleep(0.1))
+
+        self.assertEqual(self._app.active_requests, 0)
+        self.handled.set()
+        self.io_loop.run_sync(lambda: asyncio.sleep(0.1))
+        self.assertEqual(self._app.active_requests, 0)
+
+
+class ReadinessHandlerTestCase(AsyncHTTPTestCase):
+    """TestCase for the ReadinessHandler."""
+
+    def setUp(self) -> None:
+        """Set up the test fixture before exercising it."""
+        super().setUp()
+        self.addCleanup(patch.stopall)
+        self.m_redis = patch('server.utils.Redis', return_value=FakeRedis()).start()
+
+    def get_app(self) -> Application:
+        """Return a Tornado application."""
+        return MyApplication(
+            urls=[
+                url(r'/ready/', ReadinessHandler),
+            ],
+        )
+
+    def test_get_returns_ready_when_app_is_running(self):
+        """Test get returns 200 when the app is running and Redis is reachable."""
+        response = self.fetch('/ready/')
+
+        self.assertEqual(response.code, 200)
+        self.assertEqual(json.loads(response.body), {'status': 'ready'})
+        self.assertEqual(self._app.active_requests, 0)
+
+    def test_get_returns_unavailable_when_app_is_shutting_down(self):
+        """Test get returns 503 when the app is shutting down."""
+        self._app.ready = False
+
+        response = self.fetch('/ready/')
+
+        self.assertEqual(response.code, 503)
+        self.assertEqual(json.loads(response.body), {'status': 'shutting down'})
+
+    def test_get_returns_unavailable_when_redis_is_unreachable(self):
+        """Test get returns 503 when Redis can't be reached."""
+        self.m_redis.return_value.ping = Mock(side_effect=RedisConnectionError())
+
+        response = self.fetch('/ready/')
+
+        self.assertEqual(response.code, 503)
+        self.assertEqual(json.loads(response.body), {'status': 'redis unavailable'})
+
+
 class SlackHandlerTestCase(AsyncHTTPTestCase):
     """TestCase for the SlackHandler."""
 
@@ -217,6 +311,60 @@ class SlackHandlerTestCase(AsyncHTTPTestCase):
         self.assertTrue(self.task_delay.called)
         m_postmessage.assert_awaited_once_with(channel=channel, text="I'll respond in a moment...")
 
+    @patch.object(SlackHandler, 'fast_ack', True)
+    @patch.object(AsyncWebClient, 'chat_postMessage')
+    def test_post_only_schedules_task_in_fast_ack_mode(self, m_postmessage):
+        """Test post schedules a task that acknowledges the message instead of posting the acknowledgement itself."""
+        data = {
+            'type': 'event_callback',
+            'event_id': 'EvUVFHBRNE',
+            'event': {
+                'type': 'message',
+                'text': 'sprint 12',
+                'user': 'user_id',
+                'channel': 'testchannel',
+                'channel_type': 'im',
+            },
+        }
+
+        response = self.fetch(
+            self.url,
+            method='POST',
+            body=json.dumps(data),
+            headers=self._prepare_headers(data),
+        )
+
+        self.assertEqual(response.code, 200)
+        self.task_delay.assert_called_once_with(data['event'], True)
+        m_postmessage.assert_not_called()
+
+    @patch.object(AsyncWebClient, 'chat_postMessage')
+    def test_post_submits_job_to_the_app_job_runner_when_it_is_set(self, m_postmessage):
+        """Test post runs the job in the app instead of Celery when the app has a job runner."""
+        self._app.job_runner = Mock()
+        data = {
+            'type': 'event_callback',
+            'event_id': 'EvUVFHBRNE',
+            'event': {
+                'type': 'message',
+                'text': 'sprint 12',
+                'user': 'user_id',
+                'channel': 'testchannel',
+                'channel_type': 'im',
+            },
+        }
+
+        response = self.fetch(
+            self.url,
+            method='POST',
+            body=json.dumps(data),
+            headers=self._prepare_headers(data),
+        )
+
+        self.assertEqual(response.code, 200)
+        self._app.job_runner.submit.assert_called_once_with(jobs.handle_message, data['event'])
+        self.assertFalse(self.task_delay.called)
+
     @patch.object(AsyncWebClient, 'chat_postMessage')
     def test_post_does_nothing_when_message_is_not_from_an_valid_channel(self, m_postmessage):
         """Test if a message is handled when it came from a channel_type=channel."""
@@ -308,51 +456,148 @@ class SlackHandlerTestCase(AsyncHTTPTestCase):
         self.task_delay.assert_not_called()
         m_postmessage.assert_not_called()
 
-    @patch.object(AsyncWebClient, 'chat_postMessage')
-    def test_post_does_nothing_when_message_is_a_retry(self, m_postmessage):
-        """Test if a message is handled when the message was sent as a retry message."""
+    def _post_message_event(self, event_id: str, retry_num: str = None):
+        """Post a direct message event and return the response."""
         data = {
-            'token': 'test_token',
-            'team_id': 'teamId123',
-            'api_app_id': 'appId123',
+            'type': 'event_callback',
+            'event_id': event_id,
             'event': {
-                'client_msg_id': 'message_id',
                 'type': 'message',
-                'text': 'This is an example message',
+                'text': 'sprint 12',
                 'user': 'user_id',
-                'ts': '1583950633.000800',
-                'team': 'teamId123',
-                'blocks': [{
-                    'type': 'rich_text',
-                    'block_id': '8ye',
-                    'elements': [{
-                        'type': 'rich_text_section',
-                        'elements': [{'type': 'text', 'text': 'This is an example message'}],
-                    }],
-                }],
                 'channel': 'ChannelId',
-                'event_ts': '1583950633.000800',
                 'channel_type': 'im',
             },
-            'type': 'event_callback',
-            'event_id': 'EvUVFHBRNE',
-            'event_time': 1583950633,
-            'authed_users': ['user_id234'],
         }
         headers = self._prepare_headers(data)
-        headers['X-Slack-Retry-Num'] = '1'
-
-        response = self.fetch(
+        if retry_num:
+            headers['X-Slack-Retry-Num'] = retry_num
+        return self.fetch(
             self.url,
             method='POST',
             body=json.dumps(data),
             headers=headers,
         )
 
+    @patch.object(AsyncWebClient, 'chat_postMessage')
+    def test_post_does_nothing_when_event_was_already_handled(self, m_postmessage):
+        """Test if a retry or a duplicate of an event that was handled is dropped."""
+        self._post_message_event('EvUVFHBRNE')
+
+        retry = self._post_message_event('EvUVFHBRNE', retry_num='1')
+        self._app.events = EventDeduplicator()
+        duplicate = self._post_message_event('EvUVFHBRNE')
+
+        self.assertEqual(retry.code, 200)
+        self.assertEqual(duplicate.code, 200)
+        self.task_delay.assert_called_once()
+        m_postmessage.assert_awaited_once()
+
+    @patch.object(AsyncWebClient, 'chat_postMessage')
+    def test_post_handles_a_retry_of_an_event_that_was_not_handled(self, m_postmessage):
+        """Test if a retry is handled when its first delivery didn't reach the app."""
+        response = self._post_message_event('EvUVFHBRNE', retry_num='2')
+
         self.assertEqual(response.code, 200)
+        self.task_delay.assert_called_once()
+        m_postmessage.assert_awaited_once()
+
+    @patch.object(AsyncWebClient, 'chat_postMessage')
+    def test_post_handles_a_retry_of_an_event_that_failed(self, m_postmessage):
+        """Test if a retry is handled when its first delivery failed, e.g. because the broker was unavailable."""
+        self.task_delay.side_effect = [ConnectionError('broker unavailable'), None]
+
+        with ExpectLog('tornado.application', 'Uncaught exception'):
+            first = self._post_message_event('EvUVFHBRNE')
+        retry = self._post_message_event('EvUVFHBRNE', retry_num='1')
+
+        self.assertEqual(first.code, 500)
+        self.assertEqual(retry.code, 200)
+        self.assertEqual(self.task_delay.call_count, 2)
+
+    def _post_user_event(self, event_type: str, user: dict, event_id: str = None):
+        """Post a user event and return the response."""
+        data = {
+            'type': 'event_callback',
+            'event_id': event_id or f'Ev-{event_type}',
+            'event': {'type': event_type, 'user': user},
+        }
+        return self.fetch(
+            self.url,
+            method='POST',
+            body=json.dumps(data),
+            headers=self._prepare_headers(data),
+        )
+
+    @patch.object(AsyncWebClient, 'chat_postMessage')
+    def test_post_adds_new_member_to_the_index_when_user_joins(self, m_postmessage):
+        """Test if a member that joined the workspace can be mentioned right away."""
+        self.fake_redis.set('slack-known-user-ids', json.dumps({'Paweł Nowak': 'Paweł Nowak'}))
+        user = {'id': 'U1', 'deleted': False, 'profile': {'real_name_normalized': 'Paweł Nowak'}}
+
+        response = self._post_user_event('team_join', user)
+
+        self.assertEqual(response.code, 200)
+        self.assertEqual(
+            self.fake_redis.hgetall('slack-members-index'),
+            {'Paweł Nowak'.encode(): b'U1', b'Pawel Nowak': b'U1'},
+        )
+        self.assertTrue(self.fake_redis.hexists('slack-members', 'U1'))
+        self.assertFalse(self.fake_redis.exists('slack-known-user-ids'))
         self.task_delay.assert_not_called()
         m_postmessage.assert_not_called()
 
+    def test_post_replaces_member_names_in_the_index_when_user_changes(self):
+        """Test if index entries of the member's previous name are replaced, other members' ones are kept."""
+        user = {'id': 'U1', 'deleted': False, 'profile': {'real_name_normalized': 'Jan Kowalski'}}
+        self._post_user_event('team_join', user)
+        self.fake_redis.hset('slack-members-index', 'Jan', 'U2')
+
+        user['profile']['real_name_normalized'] = 'Jan Nowak'
+        response = self._post_user_event('user_change', user)
+
+        self.assertEqual(response.code, 200)
+        self.assertEqual(self.fake_redis.hgetall('slack-members-index'), {b'Jan Nowak': b'U1', b'Jan': b'U2'})
+
+    def test_post_removes_deleted_member_from_the_index(self):
+        """Test if a deactivated member is no longer in the index."""
+        user = {'id': 'U1', 'deleted': False, 'profile': {'real_name_normalized': 'Jan Kowalski'}}
+        self._post_user_event('team_join', user)
+
+        user['deleted'] = True
+        self._post_user_event('user_change', user)
+
+        self.assertEqual(self.fake_redis.hgetall('slack-members-index'), {})
+        self.assertTrue(json.loads(self.fake_redis.hget('slack-members', 'U1'))['deleted'])
+
+    def test_post_keeps_resolved_mentions_when_user_changes_only_status(self):
+        """Test if the cache of resolved mentions is kept when neither the name nor the deleted flag changed."""
+        user = {'id': 'U1', 'deleted': False, 'profile': {'real_name_normalized': 'Jan Kowalski'}}
+        self._post_user_event('user_change', user, event_id='Ev1')
+        self.fake_redis.set('slack-known-user-ids', json.dumps({'Jan Kowalski': '<@U1>'}))
+
+        user['profile']['status_emoji'] = ':palm_tree:'
+        self._post_user_event('user_change', user, event_id='Ev2')
+        cached_after_status_change = self.fake_redis.exists('slack-known-user-ids')
+        user['profile']['real_name_normalized'] = 'Jan Nowak'
+        self._post_user_event('user_change', user, event_id='Ev3')
+
+        self.assertTrue(cached_after_status_change)
+        self.assertFalse(self.fake_redis.exists('slack-known-user-ids'))
+
+    def test_post_skips_member_events_until_the_directory_of_an_older_version_is_synced(self):
+        """Test if a member event is skipped instead of failing while the directory is stored as a JSON list."""
+        legacy_members = json.dumps([{'id': 'U2', 'deleted': False, 'profile': {'real_name_normalized': 'Adam Nowak'}}])
+        self.fake_redis.set('slack-members', legacy_members)
+        user = {'id': 'U1', 'deleted': False, 'profile': {'real_name_normalized': 'Jan Kowalski'}}
+
+        with self.assertLogs('reporter', 'WARNING'):
+            response = self._post_user_event('team_join', user)
+
+        self.assertEqual(response.code, 200)
+        self.assertEqual(self.fake_redis.get('slack-members'), legacy_members.encode())
+        self.assertFalse(self.fake_redis.exists('slack-members-index'))
+
 
 class SprintChangeHandlerTestCase(AsyncHTTPTestCase):
     """TestCase for the SprintChangeHandler."""
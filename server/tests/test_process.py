@@ -0,0 +1,62 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+from urllib.request import urlopen
+
+from asynctest import TestCase
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class SupervisorTestCase(TestCase):
+    """TestCase for the app running in many processes."""
+
+    def setUp(self) -> None:
+        """Set up the test fixture before exercising it."""
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            self.port = sock.getsockname()[1]
+        self.process = subprocess.Popen(
+            [sys.executable, '-u', 'app.py', f'--port={self.port}', '--processes=2', '--logging=none'],
+            cwd=BASE_DIR,
+            env={**os.environ, 'DEBUG': 'false'},
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True,
+            start_new_session=True,
+        )
+        # Don't let stuck or orphaned processes hang the test suite.
+        self.watchdog = threading.Timer(30, self._kill_processes)
+        self.watchdog.start()
+
+    def tearDown(self) -> None:
+        """Deconstruct the test fixture after testing it."""
+        self.watchdog.cancel()
+        self._kill_processes()
+        self.process.wait()
+        self.process.stdout.close()
+
+    def _kill_processes(self) -> None:
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    def test_sigterm_sent_to_parent_stops_every_process_gracefully(self):
+        """Test SIGTERM sent to the parent process is forwarded to children that shut down before it exits."""
+        started = 0
+        while started < 2:
+            line = self.process.stdout.readline()
+            self.assertTrue(line, 'The app exited before all processes started')
+            started += line.count('Tornado app starting')
+        with urlopen(f'http://127.0.0.1:{self.port}/') as response:
+            self.assertEqual(response.status, 200)
+
+        self.process.send_signal(signal.SIGTERM)
+        output, _ = self.process.communicate(timeout=20)
+
+        self.assertEqual(self.process.returncode, 0)
+        self.assertEqual(output.count('Tornado app shutting down'), 2)
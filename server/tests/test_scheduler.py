@@ -0,0 +1,120 @@
+import asyncio
+from datetime import timedelta
+
+from asynctest import CoroutineMock, Mock, TestCase
+from celery.schedules import crontab, schedule
+
+from ..scheduler import JobRunner, Scheduler
+
+
+class JobRunnerTestCase(TestCase):
+    """TestCase for the JobRunner."""
+
+    def setUp(self) -> None:
+        """Set up the test fixture before exercising it."""
+        self.runner = JobRunner(concurrency=2)
+
+    async def test_job_is_awaited_with_given_arguments(self):
+        """Test the job is awaited with the arguments it was submitted with."""
+        job = CoroutineMock(__name__='job')
+
+        await self.runner.submit(job, {'text': 'sprint 1'})
+
+        job.assert_awaited_once_with({'text': 'sprint 1'})
+
+    async def test_job_with_the_same_arguments_is_not_submitted_twice(self):
+        """Test a job is skipped while the same job with the same arguments is pending."""
+        job = CoroutineMock(__name__='job')
+
+        first = self.runner.submit(job, 1)
+        second = self.runner.submit(job, 1)
+        third = self.runner.submit(job, 2)
+        await self.runner.join()
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, third)
+        self.assertEqual(job.await_count, 2)
+
+    async def test_finished_job_can_be_submitted_again(self):
+        """Test a job can be submitted again once it has finished."""
+        job = CoroutineMock(__name__='job')
+
+        await self.runner.submit(job)
+        await self.runner.submit(job)
+
+        self.assertEqual(job.await_count, 2)
+
+    async def test_concurrency_is_bounded(self):
+        """Test no more jobs than the concurrency limit run at the same time."""
+        running, peak = 0, 0
+
+        async def job(number):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        for number in range(5):
+            self.runner.submit(job, number)
+        await self.runner.join()
+
+        self.assertEqual(peak, 2)
+
+    async def test_failing_job_does_not_raise(self):
+        """Test an exception in a job is logged and doesn't break the runner."""
+        job = CoroutineMock(__name__='job', side_effect=ValueError('error'))
+
+        with self.assertLogs('server', level='ERROR'):
+            await self.runner.submit(job)
+
+        self.assertEqual(self.runner.tasks, {})
+
+
+class SchedulerTestCase(TestCase):
+    """TestCase for the Scheduler."""
+
+    def setUp(self) -> None:
+        """Set up the test fixture before exercising it."""
+        self.runner = JobRunner()
+        self.runner.submit = Mock()
+
+    def test_entries_are_built_from_the_celery_beat_schedule(self):
+        """Test the default entries come from the Celery beat schedule."""
+        scheduler = Scheduler(self.runner)
+
+        self.assertEqual(len(scheduler.entries), 3)
+        self.assertTrue(all(isinstance(entry[1], crontab) for entry in scheduler.entries))
+
+    def test_due_job_is_submitted(self):
+        """Test a job is submitted when it's due and its last run is updated."""
+        scheduler = Scheduler(self.runner, {
+            'display-pull-requests': {
+                'task': 'server.tasks.display_pull_requests',
+                'schedule': schedule(timedelta(minutes=5)),
+            },
+        })
+        job, entry_schedule, args = scheduler.entries[0]
+        last_run_at = [entry_schedule.now() - timedelta(minutes=6)]
+
+        interval = scheduler.tick(last_run_at)
+
+        self.runner.submit.assert_called_once_with(job)
+        self.assertAlmostEqual(interval, 300, delta=1)
+        self.assertGreater(last_run_at[0], entry_schedule.now() - timedelta(minutes=1))
+
+    def test_job_is_not_submitted_before_it_is_due(self):
+        """Test a job is not submitted before it's due and the interval is the time left."""
+        scheduler = Scheduler(self.runner, {
+            'handle-message': {
+                'task': 'server.tasks.handle_message',
+                'schedule': schedule(timedelta(minutes=1)),
+                'args': ({'text': 'sprint 1'},),
+            },
+        })
+        last_run_at = [scheduler.entries[0][1].now()]
+
+        interval = scheduler.tick(last_run_at)
+
+        self.runner.submit.assert_not_called()
+        self.assertAlmostEqual(interval, 60, delta=1)
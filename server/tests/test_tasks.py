@@ -1,12 +1,20 @@
 from io import StringIO
+import json
 
-from asynctest import ANY, CoroutineMock, TestCase, patch
+from asynctest import ANY, CoroutineMock, MagicMock, TestCase, patch
 from fakeredis import FakeRedis
+from slack_sdk.errors import SlackApiError
 from slack_sdk.web.async_client import AsyncWebClient
 
 from reporter.bridge import Bridge
+from reporter.teams import set_teams
 
-from ..tasks import display_changelog, handle_message
+from ..tasks import (
+    display_changelog,
+    display_pull_requests,
+    handle_message,
+    update_workspace_users,
+)
 
 
 class HandleMessageTestCase(TestCase):
@@ -111,6 +119,19 @@ class HandleMessageTestCase(TestCase):
 
         self.bridge_run.assert_awaited_once_with()
 
+    def test_task_acknowledges_message_before_handling_it(self):
+        """Test task posts the acknowledgement first when it's asked to."""
+        channel = 'channelId123'
+        data = {'type': 'message', 'text': 'sprint 392', 'user': 'user_id', 'channel': channel, 'channel_type': 'im'}
+        calls = []
+        self.m_post_message.side_effect = lambda **kwargs: calls.append('acknowledgement')
+        self.bridge_run.side_effect = lambda: calls.append('run')
+
+        self.task(data, acknowledge=True)
+
+        self.m_post_message.assert_awaited_once_with(channel=channel, text="I'll respond in a moment...")
+        self.assertEqual(calls, ['acknowledgement', 'run'])
+
 
 class HandleChangelogTestCase(TestCase):
     """TestCase for display_changelog task."""
@@ -130,7 +151,7 @@ class HandleChangelogTestCase(TestCase):
     def tearDown(self) -> None:
         self.fake_redis.flushall()
 
-    @patch('server.tasks.open')
+    @patch('server.jobs.open')
     def test_task_posts_content_of_the_changelog(self, m_open):
         """Test task posts content of the changelog to slack."""
         changelog_content = """
@@ -150,3 +171,179 @@ class HandleChangelogTestCase(TestCase):
         self.task()
 
         self.m_post_message.assert_awaited_once_with(channel=ANY, text=changelog_content)
+
+
+class UpdateWorkspaceUsersTestCase(TestCase):
+    """TestCase for update_workspace_users task."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up class fixture before running tests in the class."""
+        cls.fake_redis = FakeRedis()
+        cls.task = update_workspace_users
+
+    def setUp(self) -> None:
+        """Set up the test fixture before exercising it."""
+        self.addCleanup(patch.stopall)
+        patch('server.utils.Redis', return_value=self.fake_redis).start()
+        self.m_users_list = patch.object(AsyncWebClient, 'users_list', new=CoroutineMock()).start()
+
+    def tearDown(self) -> None:
+        self.fake_redis.flushall()
+
+    def test_task_indexes_members_by_real_name_and_ascii_name(self):
+        """Test task builds the members index from real names and their ascii versions."""
+        self.m_users_list.return_value = {
+            'members': [
+                {'id': 'U1', 'deleted': False, 'profile': {'real_name_normalized': 'Paweł Nowak'}},
+                {'id': 'U2', 'deleted': True, 'profile': {'real_name_normalized': 'Jan Kowalski'}},
+                {'id': 'U3', 'deleted': False, 'profile': {}},
+            ],
+        }
+
+        self.task()
+
+        self.assertEqual(
+            self.fake_redis.hgetall('slack-members-index'),
+            {b'Pawe\xc5\x82 Nowak': b'U1', b'Pawel Nowak': b'U1'},
+        )
+
+    def test_task_follows_cursor_and_stores_compact_members(self):
+        """Test task fetches every page of members and keeps only the used fields of every member."""
+        self.m_users_list.side_effect = [
+            {
+                'members': [{
+                    'id': 'U1',
+                    'deleted': False,
+                    'profile': {'real_name_normalized': 'Jan Kowalski', 'display_name': 'jan', 'image_72': 'url'},
+                }],
+                'response_metadata': {'next_cursor': 'cursor1'},
+            },
+            {
+                'members': [{'id': 'U2', 'deleted': True, 'profile': {'real_name_normalized': 'Adam Nowak'}}],
+                'response_metadata': {'next_cursor': ''},
+            },
+        ]
+
+        self.task()
+
+        self.assertEqual(self.m_users_list.await_count, 2)
+        self.assertEqual(self.m_users_list.await_args[1]['cursor'], 'cursor1')
+        self.assertEqual(
+            {key: json.loads(value) for key, value in self.fake_redis.hgetall('slack-members').items()},
+            {
+                b'U1': {'id': 'U1', 'real_name_normalized': 'Jan Kowalski', 'display_name': 'jan', 'deleted': False},
+                b'U2': {'id': 'U2', 'real_name_normalized': 'Adam Nowak', 'display_name': None, 'deleted': True},
+            },
+        )
+        self.assertEqual(self.fake_redis.hgetall('slack-members-index'), {b'Jan Kowalski': b'U1'})
+
+    def test_task_replaces_members_that_are_no_longer_in_the_workspace(self):
+        """Test task removes members and index entries that weren't synced."""
+        self.fake_redis.hset('slack-members', 'U9', '{}')
+        self.fake_redis.hset('slack-members-index', 'Old Name', 'U9')
+        self.m_users_list.return_value = {
+            'members': [{'id': 'U1', 'deleted': False, 'profile': {'real_name_normalized': 'Jan Kowalski'}}],
+        }
+
+        self.task()
+
+        self.assertEqual(list(self.fake_redis.hkeys('slack-members')), [b'U1'])
+        self.assertEqual(self.fake_redis.hgetall('slack-members-index'), {b'Jan Kowalski': b'U1'})
+        self.assertEqual(self.fake_redis.keys('*:sync'), [])
+
+    def test_task_replaces_members_directory_stored_by_an_older_version(self):
+        """Test task replaces the directory stored as a JSON list by older versions with the hashes."""
+        self.fake_redis.set('slack-members', json.dumps([{'id': 'U9', 'profile': {'real_name_normalized': 'Old'}}]))
+        self.m_users_list.return_value = {
+            'members': [{'id': 'U1', 'deleted': False, 'profile': {'real_name_normalized': 'Jan Kowalski'}}],
+        }
+
+        self.task()
+
+        self.assertEqual(list(self.fake_redis.hkeys('slack-members')), [b'U1'])
+        self.assertEqual(self.fake_redis.hgetall('slack-members-index'), {b'Jan Kowalski': b'U1'})
+
+    def test_task_retries_rate_limited_pages(self):
+        """Test task requests a page of members again after it was rate limited."""
+        response = MagicMock(headers={'Retry-After': '0'})
+        response.get.return_value = 'ratelimited'
+        self.m_users_list.side_effect = [
+            SlackApiError('ratelimited', response),
+            {'members': [{'id': 'U1', 'deleted': False, 'profile': {'real_name_normalized': 'Jan Kowalski'}}]},
+        ]
+
+        with self.assertLogs('reporter', 'WARNING'):
+            self.task()
+
+        self.assertEqual(self.m_users_list.await_count, 2)
+        self.assertEqual(self.fake_redis.hgetall('slack-members-index'), {b'Jan Kowalski': b'U1'})
+
+    def test_task_keeps_members_and_drops_temporary_keys_when_sync_fails(self):
+        """Test task leaves the current directory in place and no temporary hashes after a failed sync."""
+        self.fake_redis.hset('slack-members-index', 'Jan Kowalski', 'U1')
+        response = MagicMock(headers={})
+        response.get.return_value = 'invalid_auth'
+        self.m_users_list.side_effect = [
+            {
+                'members': [{'id': 'U2', 'deleted': False, 'profile': {'real_name_normalized': 'Adam Nowak'}}],
+                'response_metadata': {'next_cursor': 'cursor1'},
+            },
+            SlackApiError('invalid_auth', response),
+        ]
+
+        with self.assertRaises(SlackApiError):
+            self.task()
+
+        self.assertEqual(self.fake_redis.hgetall('slack-members-index'), {b'Jan Kowalski': b'U1'})
+        self.assertEqual(self.fake_redis.keys('*:sync'), [])
+
+    def test_task_drops_resolved_mentions(self):
+        """Test task drops the cache of resolved mentions, so reviewers that weren't found are looked up again."""
+        self.fake_redis.set('slack-known-user-ids', json.dumps({'Jan Kowalski': 'Jan Kowalski'}))
+        self.m_users_list.return_value = {
+            'members': [{'id': 'U1', 'deleted': False, 'profile': {'real_name_normalized': 'Jan Kowalski'}}],
+        }
+
+        self.task()
+
+        self.assertFalse(self.fake_redis.exists('slack-known-user-ids'))
+
+
+class DisplayPullRequestsTestCase(TestCase):
+    """TestCase for display_pull_requests task."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up class fixture before running tests in the class."""
+        cls.fake_redis = FakeRedis()
+        cls.task = display_pull_requests
+
+    def setUp(self) -> None:
+        """Set up the test fixture before exercising it."""
+        self.addCleanup(patch.stopall)
+        patch('server.utils.Redis', return_value=self.fake_redis).start()
+        self.bridge_run = patch.object(Bridge, 'run', new=CoroutineMock()).start()
+        self.run_teams = patch.object(Bridge, 'run_teams', new=CoroutineMock()).start()
+
+    def tearDown(self) -> None:
+        self.fake_redis.flushall()
+
+    def test_task_runs_the_default_bridge_when_teams_are_not_configured(self):
+        """Test task posts the reminder of the default sprint and channel without teams."""
+        self.fake_redis.set('sprint-number', 412)
+
+        self.task()
+
+        self.bridge_run.assert_awaited_once_with()
+        self.run_teams.assert_not_awaited()
+
+    def test_task_runs_every_configured_team(self):
+        """Test task posts reminders of all configured teams."""
+        teams = [{'channel_id': 'C1', 'sprint': 412}, {'channel_id': 'C2', 'board': 12}]
+        set_teams(teams)
+
+        self.task()
+
+        self.run_teams.assert_awaited_once_with(teams)
+        self.bridge_run.assert_not_awaited()
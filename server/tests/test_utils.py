@@ -0,0 +1,125 @@
+import asyncio
+import threading
+
+from asynctest import TestCase, patch
+from fakeredis import FakeRedis
+
+from ..utils import (
+    EventDeduplicator,
+    get_event_loop,
+    run_coroutine,
+    stop_event_loop,
+)
+
+
+class RunCoroutineTestCase(TestCase):
+    """TestCase for running coroutines in the process-wide event loop."""
+
+    def tearDown(self) -> None:
+        stop_event_loop()
+
+    def test_coroutine_result_is_returned(self):
+        """Test the coroutine's result is returned to the caller."""
+        async def coroutine():
+            await asyncio.sleep(0)
+            return 'result'
+
+        self.assertEqual(run_coroutine(coroutine()), 'result')
+
+    def test_coroutine_runs_in_a_background_thread(self):
+        """Test the coroutine runs outside of the calling thread."""
+        async def coroutine():
+            return threading.current_thread()
+
+        self.assertIsNot(run_coroutine(coroutine()), threading.current_thread())
+
+    def test_event_loop_is_reused(self):
+        """Test following calls share the same event loop."""
+        async def coroutine():
+            return asyncio.get_event_loop()
+
+        first, second = run_coroutine(coroutine()), run_coroutine(coroutine())
+
+        self.assertIs(first, second)
+        self.assertIs(first, get_event_loop())
+
+    def test_exception_is_propagated(self):
+        """Test an exception raised by the coroutine is raised to the caller."""
+        async def coroutine():
+            raise ValueError('error')
+
+        with self.assertRaises(ValueError):
+            run_coroutine(coroutine())
+
+    def test_stopped_event_loop_is_closed(self):
+        """Test stopping the event loop closes it and a new one is started afterwards."""
+        loop = get_event_loop()
+
+        stop_event_loop()
+
+        self.assertTrue(loop.is_closed())
+        self.assertIsNot(get_event_loop(), loop)
+
+
+class EventDeduplicatorTestCase(TestCase):
+    """TestCase for the EventDeduplicator."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up class fixture before running tests in the class."""
+        cls.fake_redis = FakeRedis()
+
+    def setUp(self) -> None:
+        """Set up the test fixture before exercising it."""
+        self.addCleanup(patch.stopall)
+        self.m_redis = patch('server.utils.Redis', return_value=self.fake_redis).start()
+
+    def tearDown(self) -> None:
+        self.fake_redis.flushall()
+
+    def test_event_is_new_only_once(self):
+        """Test an event is new only the first time it's seen."""
+        events = EventDeduplicator(ttl=60, max_size=10)
+
+        self.assertTrue(events.is_new('Ev1'))
+        self.assertFalse(events.is_new('Ev1'))
+        self.assertTrue(events.is_new('Ev2'))
+        self.assertTrue(0 < self.fake_redis.ttl('slack-event:Ev1') <= 60)
+
+    def test_event_seen_by_another_process_is_not_new(self):
+        """Test an event claimed by another store, e.g. in another process, is not new."""
+        EventDeduplicator().is_new('Ev1')
+
+        self.assertFalse(EventDeduplicator().is_new('Ev1'))
+
+    def test_released_event_is_new_again(self):
+        """Test an event whose claim was released, e.g. because handling it failed, is new again."""
+        events = EventDeduplicator(ttl=60, max_size=10)
+        events.is_new('Ev1')
+
+        events.release('Ev1')
+
+        self.assertFalse(self.fake_redis.exists('slack-event:Ev1'))
+        self.assertTrue(events.is_new('Ev1'))
+
+    def test_event_released_by_another_process_is_new_again(self):
+        """Test an event claimed by another store is new once that store released it."""
+        other, events = EventDeduplicator(ttl=60, max_size=10), EventDeduplicator(ttl=60, max_size=10)
+        other.is_new('Ev1')
+        self.assertFalse(events.is_new('Ev1'))
+
+        other.release('Ev1')
+
+        self.assertTrue(events.is_new('Ev1'))
+
+    def test_recently_seen_event_is_dropped_without_redis(self):
+        """Test a repeated event is answered from memory and the oldest events are evicted."""
+        events = EventDeduplicator(ttl=60, max_size=2)
+        for event_id in ('Ev1', 'Ev2', 'Ev3'):
+            events.is_new(event_id)
+        self.m_redis.reset_mock()
+
+        self.assertFalse(events.is_new('Ev3'))
+        self.m_redis.assert_not_called()
+        self.assertFalse(events.is_new('Ev1'))
+        self.m_redis.assert_called_once()
@@ -1,9 +1,15 @@
 from tornado.web import url
 
-from .handlers import HomeHandler, SlackHandler, SprintChangeHandler
+from .handlers import (
+    HomeHandler,
+    ReadinessHandler,
+    SlackHandler,
+    SprintChangeHandler,
+)
 
 urls = [
     url(r'/', HomeHandler, name='main'),
+    url(r'/ready/', ReadinessHandler, name='ready'),
     url(r'/slack/events/', SlackHandler, name='slack'),
     url(r'/sprint/change/', SprintChangeHandler, name='sprint-change'),
 ]
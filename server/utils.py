@@ -1,8 +1,15 @@
-from typing import Optional
+import asyncio
+from collections import OrderedDict
+import os
+import threading
+from time import monotonic
+from typing import Any, Awaitable, Optional
 
-from redis import Redis
+from redis import ConnectionPool, Redis, UnixDomainSocketConnection
 
 from .configuration.settings import (
+    EVENT_CACHE_SIZE,
+    EVENT_TTL,
     REDIS_DATABASE,
     REDIS_HOST,
     REDIS_PASSWORD,
@@ -26,12 +33,134 @@ def validate_text(text: str) -> Optional[int]:
     return None
 
 
+_connection_pool: Optional[ConnectionPool] = None
+
+
+def get_connection_pool() -> ConnectionPool:
+    """Return the process-wide Redis connection pool."""
+    global _connection_pool
+
+    if _connection_pool is None:
+        config = {
+            'db': REDIS_DATABASE,
+            'password': REDIS_PASSWORD,
+        }
+        if REDIS_SOCKET_PATH:
+            config.update(connection_class=UnixDomainSocketConnection, path=REDIS_SOCKET_PATH)
+        else:
+            config.update(host=REDIS_HOST)
+        _connection_pool = ConnectionPool(**config)
+    return _connection_pool
+
+
 def get_redis_instance() -> Redis:
-    """Return a Redis instance with the proper configuration."""
-    config = {
-        'db': REDIS_DATABASE,
-        'unix_socket_path': REDIS_SOCKET_PATH,
-        'password': REDIS_PASSWORD,
-        'host': REDIS_HOST,
-    }
-    return Redis(**config)
+    """
+    Return a Redis instance with the proper configuration.
+
+    Instances share a connection pool, so closing an instance returns its connection to the pool instead of
+    disconnecting it.
+    """
+    return Redis(connection_pool=get_connection_pool())
+
+
+class EventDeduplicator:
+    """
+    An idempotency store of Slack events.
+
+    An event id is claimed in Redis with SET NX, so only one delivery of an event is handled even across processes.
+    Ids claimed by this process are also kept in a small in-memory LRU, so repeated deliveries to the same process are
+    dropped without a round trip to Redis. A claim of an event that failed to be handled is released, so Slack's
+    retry of it is handled.
+    """
+
+    def __init__(self, ttl: int = EVENT_TTL, max_size: int = EVENT_CACHE_SIZE):
+        """
+        Initialize.
+
+        :param ttl: for how many seconds an event id is remembered
+        :param max_size: the maximum number of event ids remembered in memory
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._seen: OrderedDict = OrderedDict()
+
+    def is_new(self, event_id: str) -> bool:
+        """
+        Claim an event and return whether it wasn't seen before.
+
+        :param event_id: the `event_id` of an Events API payload
+        """
+        seen_at = self._seen.get(event_id)
+        if seen_at is not None and monotonic() - seen_at < self.ttl:
+            self._seen.move_to_end(event_id)
+            return False
+
+        with get_redis_instance() as redis:
+            claimed = redis.set(f'slack-event:{event_id}', 1, nx=True, ex=self.ttl)
+        if not claimed:
+            # Not remembered, the claim of another process is released only in Redis when handling the event fails.
+            return False
+
+        self._seen[event_id] = monotonic()
+        self._seen.move_to_end(event_id)
+        if len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+        return True
+
+    def release(self, event_id: str) -> None:
+        """
+        Forget a claimed event, so its next delivery is handled.
+
+        :param event_id: the `event_id` of an Events API payload
+        """
+        self._seen.pop(event_id, None)
+        with get_redis_instance() as redis:
+            redis.delete(f'slack-event:{event_id}')
+
+
+_event_loop: Optional[asyncio.AbstractEventLoop] = None
+_event_loop_thread: Optional[threading.Thread] = None
+_event_loop_pid: Optional[int] = None
+_event_loop_lock = threading.Lock()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Return the process-wide event loop, running forever in a background thread.
+
+    The loop is started lazily, so every forked worker process gets its own loop instead of inheriting the parent's.
+    """
+    global _event_loop, _event_loop_thread, _event_loop_pid
+
+    with _event_loop_lock:
+        if _event_loop is None or _event_loop_pid != os.getpid() or not _event_loop_thread.is_alive():
+            _event_loop = asyncio.new_event_loop()
+            _event_loop_thread = threading.Thread(
+                target=_event_loop.run_forever, name='event-loop', daemon=True,
+            )
+            _event_loop_thread.start()
+            _event_loop_pid = os.getpid()
+    return _event_loop
+
+
+def run_coroutine(coroutine: Awaitable, timeout: Optional[float] = None) -> Any:
+    """
+    Run a coroutine in the process-wide event loop and wait for its result.
+
+    :param coroutine: a coroutine to run
+    :param timeout: seconds to wait for the result, None waits forever
+    """
+    return asyncio.run_coroutine_threadsafe(coroutine, get_event_loop()).result(timeout)
+
+
+def stop_event_loop() -> None:
+    """Stop the process-wide event loop and wait for its thread to finish."""
+    global _event_loop, _event_loop_thread
+
+    with _event_loop_lock:
+        if _event_loop is None or _event_loop_pid != os.getpid():
+            return
+        _event_loop.call_soon_threadsafe(_event_loop.stop)
+        _event_loop_thread.join()
+        _event_loop.close()
+        _event_loop = _event_loop_thread = None